@@ -1,4 +1,5 @@
 # filename: app/__init__.py
+import atexit
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
@@ -7,8 +8,9 @@ from flask_login import LoginManager
 from flask_wtf.csrf import CSRFProtect
 from flask_apscheduler import APScheduler
 from config import Config
+from app.services.database import RoutingSession, init_engines
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 migrate = Migrate()
 login_manager = LoginManager()
 login_manager.login_view = 'auth.login'
@@ -23,31 +25,104 @@ def create_app(config_class=Config):
     
     # Initialize extensions
     db.init_app(app)
+    init_engines(app, db)
     migrate.init_app(app, db)
     login_manager.init_app(app)
     csrf.init_app(app)
     
+    # Keep the full-text search index, blob reference counts, per-user
+    # data versions, reminder schedules and application counters in sync
+    # with model writes
+    from app.services import search, blobstore, versions, accounts, reminders, counters
+    
     # Initialize Scheduler
+    from datetime import timedelta
     from app.services.notifications import check_upcoming_deadlines
+    from app.services.mailer import deliver_outbox
+    from app.services.blobstore import collect_garbage
+    from app.services.rollups import snapshot_daily
+    from app.services.metrics import init_metrics, timed_job
+    from app.services.leader import leader_job, heartbeat, release, prune_history
     scheduler.init_app(app)
     
+    # Every process runs the scheduler, but jobs only do work in the one
+    # holding the scheduler lease; the heartbeat renews it, or takes it over
+    # once the leader has died. Daily jobs tick often and rely on the job_run
+    # history to run once a day, which survives restarts and failover.
     if not app.config.get('TESTING'):
         scheduler.start()
-    
-    # Schedule jobs
-    if not app.config.get('TESTING'):
-        @scheduler.task('interval', id='check_deadlines', hours=24)
+        tick = app.config['SCHEDULER_TICK_SECONDS']
+        
+        @scheduler.task('interval', id='scheduler_heartbeat', seconds=app.config['SCHEDULER_LEASE_RENEW_SECONDS'])
+        def scheduler_heartbeat():
+            heartbeat(app)
+        
+        @scheduler.task('interval', id='check_deadlines', seconds=app.config['REMINDER_TICK_SECONDS'])
+        @leader_job(app, 'check_deadlines')
+        @timed_job('check_deadlines')
         def scheduled_deadline_check():
-            check_upcoming_deadlines(app)
+            return check_upcoming_deadlines(app)
+        
+        @scheduler.task('interval', id='deliver_outbox', seconds=app.config['OUTBOX_POLL_SECONDS'])
+        @leader_job(app, 'deliver_outbox')
+        @timed_job('deliver_outbox')
+        def scheduled_outbox_delivery():
+            return deliver_outbox(app)
+        
+        @scheduler.task('interval', id='collect_blobs', seconds=tick)
+        @leader_job(app, 'collect_blobs', every=timedelta(hours=24))
+        @timed_job('collect_blobs')
+        def scheduled_blob_collection():
+            with app.app_context():
+                return collect_garbage(app.config['UPLOAD_FOLDER'])
+        
+        # Writes at the first tick of each UTC day; later ticks find the
+        # day's snapshot and return at once
+        @scheduler.task('interval', id='rollup_daily', seconds=tick)
+        @leader_job(app, 'rollup_daily')
+        @timed_job('rollup_daily')
+        def scheduled_daily_rollup():
+            return snapshot_daily(app)
+        
+        @scheduler.task('interval', id='prune_job_runs', seconds=tick)
+        @leader_job(app, 'prune_job_runs', every=timedelta(hours=24))
+        @timed_job('prune_job_runs')
+        def scheduled_history_pruning():
+            return prune_history(app)
+        
+        @atexit.register
+        def release_scheduler_lease():
+            try:
+                with app.app_context():
+                    release()
+            except Exception:
+                pass
     
     # Register blueprints
     from app.routes.auth import auth_bp
     from app.routes.dashboard import dashboard_bp
     from app.routes.applications import applications_bp
+    from app.routes.admin import admin_bp
     
     app.register_blueprint(auth_bp, url_prefix='/auth')
     app.register_blueprint(dashboard_bp)
     app.register_blueprint(applications_bp, url_prefix='/applications')
+    app.register_blueprint(admin_bp, url_prefix='/admin')
+    
+    # Maintenance commands (flask reminders rebuild, ...)
+    from app.commands import reminders_cli, counters_cli
+    app.cli.add_command(reminders_cli)
+    app.cli.add_command(counters_cli)
+    
+    # Opt-in Prometheus metrics at /metrics
+    init_metrics(app)
+    
+    # Cache for rendered template fragments ({% call cache_fragment(...) %})
+    from app.services.fragments import init_fragment_cache
+    init_fragment_cache(app)
+    
+    # Per-process cache for the Flask-Login user loader
+    accounts.init_user_cache(app)
     
     # Error handlers
     from app import errors
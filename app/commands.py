@@ -0,0 +1,23 @@
+import click
+from flask.cli import AppGroup
+from app import db
+from app.services.reminders import refresh_next_reminders
+from app.services.counters import recount
+
+reminders_cli = AppGroup('reminders', help='Deadline reminder maintenance.')
+counters_cli = AppGroup('counters', help='Application task/document counter maintenance.')
+
+@reminders_cli.command('rebuild')
+@click.option('--user-id', type=int, help='Only rebuild this user\'s applications.')
+def rebuild_reminders(user_id):
+    """Recompute next_reminder_at, e.g. after upgrading or a config change."""
+    count = refresh_next_reminders(user_id=user_id)
+    db.session.commit()
+    click.echo(f'Rescheduled reminders for {count} application(s).')
+
+@counters_cli.command('rebuild')
+def rebuild_counters():
+    """Recount tasks and documents for every application, fixing any drift."""
+    count = recount(db.session.connection())
+    db.session.commit()
+    click.echo(f'Repaired counters on {count} application(s).')
@@ -1,7 +1,8 @@
 # filename: app/forms.py
 from flask_wtf import FlaskForm
+from zoneinfo import available_timezones
 from wtforms import StringField, PasswordField, SubmitField, SelectField, TextAreaField, DateField, URLField
-from wtforms.validators import DataRequired, Email, EqualTo, Length, Optional, URL
+from wtforms.validators import DataRequired, Email, EqualTo, Length, Optional, URL, ValidationError
 from wtforms.widgets import TextArea
 from config import Config
 
@@ -55,4 +56,24 @@ class ApplicationForm(FlaskForm):
                          validators=[Optional()],
                          widget=TextArea(),
                          description='Any additional notes or reminders')
-    submit = SubmitField('Save Application')
\ No newline at end of file
+    submit = SubmitField('Save Application')
+
+class ReminderSettingsForm(FlaskForm):
+    timezone = SelectField('Timezone',
+                          choices=[(tz, tz) for tz in sorted(available_timezones())],
+                          default='UTC')
+    reminder_hour = SelectField('Send reminders at',
+                               choices=[(h, f'{h:02d}:00') for h in range(24)],
+                               coerce=int,
+                               default=Config.REMINDER_SEND_HOUR)
+    reminder_offsets = StringField('Days before each deadline',
+                                  validators=[DataRequired(), Length(max=64)],
+                                  description='Comma-separated, e.g. "7, 3, 1"')
+    submit = SubmitField('Save Settings')
+    
+    def validate_reminder_offsets(self, field):
+        from app.services.reminders import parse_offsets
+        try:
+            parse_offsets(field.data)
+        except ValueError:
+            raise ValidationError('Enter whole days between 0 and 365, separated by commas.')
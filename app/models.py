@@ -1,8 +1,8 @@
 # filename: app/models.py
 from datetime import datetime, date
-from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin
 from app import db, login_manager
+from app.services.passwords import PasswordHashingBusy, hash_password, verify_password, needs_rehash
 
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -10,15 +10,34 @@ class User(UserMixin, db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False, index=True)
     password_hash = db.Column(db.String(256))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Bumped on every write to the user's applications, tasks or documents
+    # (see app.services.versions); drives ETags and cache keys
+    data_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    data_changed_at = db.Column(db.DateTime)
+    # Secret in the URL of the user's iCalendar feed; NULL until requested
+    calendar_token = db.Column(db.String(64), unique=True, index=True)
+    # Reminder preferences; NULL falls back to the app-wide defaults
+    timezone = db.Column(db.String(64))
+    reminder_offsets = db.Column(db.String(64))  # comma-separated days, e.g. '7,3,1'
+    reminder_hour = db.Column(db.Integer)
     
     # Relationships
     applications = db.relationship('Application', backref='author', lazy='dynamic', cascade='all, delete-orphan')
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        if not verify_password(self.password_hash, password):
+            return False
+        # Upgrade hashes made with older parameters while the password is at
+        # hand; the caller commits. Under load the upgrade waits for next time.
+        if needs_rehash(self.password_hash):
+            try:
+                self.password_hash = hash_password(password)
+            except PasswordHashingBusy:
+                pass
+        return True
     
     def __repr__(self):
         return f'<User {self.username}>'
@@ -36,6 +55,16 @@ class Application(db.Model):
     notes = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # When the next deadline reminder is due (UTC) and for which offset;
+    # maintained by app.services.reminders, NULL when none is pending
+    next_reminder_at = db.Column(db.DateTime, index=True)
+    next_reminder_days = db.Column(db.Integer)
+    # Denormalized from the tasks and documents below so list pages need no
+    # per-row queries; maintained by app.services.counters
+    task_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    completed_task_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    document_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    document_bytes = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     # Foreign key
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -44,12 +73,21 @@ class Application(db.Model):
     __table_args__ = (
         db.Index('ix_application_user_status', 'user_id', 'status'),
         db.Index('ix_application_user_deadline', 'user_id', 'deadline'),
-        db.Index('ix_application_user_type', 'user_id', 'application_type'),
+        db.Index('ix_application_user_type_deadline', 'user_id', 'application_type', 'deadline'),
+        db.Index('ix_application_user_created', 'user_id', 'created_at'),
+        db.Index('ix_application_user_title', 'user_id', 'title'),
+        db.Index('ix_application_user_institution_deadline', 'user_id', 'institution', 'deadline'),
     )
 
     # Relationships
     tasks = db.relationship('Task', backref='application', lazy='dynamic', cascade='all, delete-orphan')
     documents = db.relationship('Document', backref='application', lazy='dynamic', cascade='all, delete-orphan')
+    reminders = db.relationship('ReminderLog', backref='application', lazy='dynamic', cascade='all, delete-orphan')
+    
+    # Read-only, eager-loadable views of the dynamic relationships above,
+    # used where every row is needed (see app.services.details)
+    task_list = db.relationship('Task', viewonly=True, order_by='Task.id')
+    document_list = db.relationship('Document', viewonly=True, order_by='Document.id')
     
     def is_overdue(self):
         if self.deadline:
@@ -70,7 +108,7 @@ class Task(db.Model):
     description = db.Column(db.String(200), nullable=False)
     is_completed = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    application_id = db.Column(db.Integer, db.ForeignKey('application.id'), nullable=False)
+    application_id = db.Column(db.Integer, db.ForeignKey('application.id'), nullable=False, index=True)
 
     def __repr__(self):
         return f'<Task {self.description}>'
@@ -81,11 +119,133 @@ class Document(db.Model):
     filepath = db.Column(db.String(255), nullable=False)
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
     file_type = db.Column(db.String(50)) # e.g., 'resume', 'cover_letter', 'transcript', 'other'
-    application_id = db.Column(db.Integer, db.ForeignKey('application.id'), nullable=False)
+    size = db.Column(db.Integer)
+    # Content hash of the stored blob; NULL for files uploaded before the blob store
+    sha256 = db.Column(db.String(64), db.ForeignKey('blob.sha256'), index=True)
+    application_id = db.Column(db.Integer, db.ForeignKey('application.id'), nullable=False, index=True)
 
     def __repr__(self):
         return f'<Document {self.filename}>'
 
+class Blob(db.Model):
+    """
+    A unique uploaded file, stored once under its SHA-256 and shared by every
+    Document with the same content. ref_count tracks those Documents; blobs
+    left at zero are removed by app.services.blobstore.collect_garbage.
+    """
+    sha256 = db.Column(db.String(64), primary_key=True)
+    size = db.Column(db.Integer, nullable=False)
+    ref_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_blob_ref_count_updated', 'ref_count', 'updated_at'),
+    )
+
+    def __repr__(self):
+        return f'<Blob {self.sha256[:12]} refs={self.ref_count}>'
+
+class ReminderLog(db.Model):
+    """
+    Ledger of deadline reminders already sent, one row per application,
+    deadline and interval, so the reminder job can be re-run safely.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    application_id = db.Column(db.Integer, db.ForeignKey('application.id', ondelete='CASCADE'), nullable=False)
+    deadline = db.Column(db.Date, nullable=False)
+    days_before = db.Column(db.Integer, nullable=False)
+    sent_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('application_id', 'deadline', 'days_before', name='uq_reminder_log_entry'),
+    )
+
+    def __repr__(self):
+        return f'<ReminderLog {self.application_id} -{self.days_before}d>'
+
+class OutboxEmail(db.Model):
+    """
+    Persistent queue of outgoing email. Rows move pending -> sending -> sent,
+    or to dead once MAIL_MAX_ATTEMPTS deliveries have failed.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    recipient = db.Column(db.String(120), nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    claim_token = db.Column(db.String(32))
+    claimed_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_outbox_email_status_next_attempt', 'status', 'next_attempt_at'),
+        db.Index('ix_outbox_email_claim_token', 'claim_token'),
+    )
+
+    def __repr__(self):
+        return f'<OutboxEmail {self.id} {self.status}>'
+
+class SchedulerLease(db.Model):
+    """
+    A named lease held by at most one process at a time. The process holding
+    the 'scheduler' lease runs the scheduled jobs; see app.services.leader.
+    """
+    name = db.Column(db.String(64), primary_key=True)
+    holder = db.Column(db.String(128), nullable=False)
+    acquired_at = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f'<SchedulerLease {self.name} {self.holder}>'
+
+class JobRun(db.Model):
+    """
+    History of scheduled job runs. outcome is running, success, error, or
+    abandoned for a run whose process lost the lease before finishing.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.String(64), nullable=False)
+    holder = db.Column(db.String(128), nullable=False)
+    started_at = db.Column(db.DateTime, nullable=False)
+    finished_at = db.Column(db.DateTime)
+    duration = db.Column(db.Float)
+    outcome = db.Column(db.String(20), nullable=False, default='running')
+    error = db.Column(db.Text)
+
+    __table_args__ = (
+        db.Index('ix_job_run_job_started', 'job_id', 'started_at'),
+    )
+
+    def __repr__(self):
+        return f'<JobRun {self.job_id} {self.outcome}>'
+
+class DailyRollup(db.Model):
+    """
+    Cross-user snapshot of application counts, one row per day, dimension
+    (status, type, country, deadline or total) and value. Written nightly by
+    app.services.rollups so admin reports never scan the application table.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False)
+    dimension = db.Column(db.String(20), nullable=False)
+    value = db.Column(db.String(100), nullable=False)
+    count = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('day', 'dimension', 'value', name='uq_daily_rollup_entry'),
+        db.Index('ix_daily_rollup_dimension_day', 'dimension', 'day'),
+    )
+
+    def __repr__(self):
+        return f'<DailyRollup {self.day} {self.dimension}={self.value}: {self.count}>'
+
 @login_manager.user_loader
 def load_user(id):
-    return User.query.get(int(id))
\ No newline at end of file
+    # Served from a short-lived per-process cache (see app.services.accounts)
+    from app.services.accounts import load_cached_user
+    return load_cached_user(int(id))
\ No newline at end of file
@@ -3,5 +3,6 @@ from flask import Blueprint
 auth_bp = Blueprint('auth', __name__)
 dashboard_bp = Blueprint('dashboard', __name__)
 applications_bp = Blueprint('applications', __name__)
+admin_bp = Blueprint('admin', __name__)
 
-from app.routes import auth, dashboard, applications
\ No newline at end of file
+from app.routes import auth, dashboard, applications, admin
\ No newline at end of file
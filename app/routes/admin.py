@@ -0,0 +1,65 @@
+# filename: app/routes/admin.py
+import functools
+from datetime import datetime, timedelta
+from flask import render_template, jsonify, request, current_app, abort
+from flask_login import login_required, current_user
+from app.routes import admin_bp
+from app.services.database import read_only
+from app.services.rollups import DIMENSIONS, latest_snapshot, trend
+
+@admin_bp.app_template_global()
+def is_admin(user):
+    return user.is_authenticated and (user.email or '').lower() in current_app.config['ADMIN_EMAILS']
+
+def admin_required(view):
+    # Apply inside login_required
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not is_admin(current_user):
+            abort(404)
+        return view(*args, **kwargs)
+    return wrapper
+
+def _report_window():
+    days = request.args.get('days', current_app.config['ROLLUP_REPORT_DAYS'], type=int)
+    days = max(1, min(days, current_app.config['ROLLUP_RETENTION_DAYS']))
+    # Rollup days are UTC days (app.services.rollups.snapshot_daily)
+    end = datetime.utcnow().date()
+    return end - timedelta(days=days - 1), end
+
+@admin_bp.route('/stats')
+@read_only
+@login_required
+@admin_required
+def stats():
+    dimension = request.args.get('dimension', 'status')
+    if dimension not in DIMENSIONS:
+        dimension = 'status'
+    start, end = _report_window()
+    
+    day, snapshot = latest_snapshot()
+    return render_template('admin/stats.html',
+                         day=day,
+                         snapshot=snapshot,
+                         dimensions=DIMENSIONS,
+                         dimension=dimension,
+                         trend=trend(dimension, start, end))
+
+@admin_bp.route('/api/stats')
+@read_only
+@login_required
+@admin_required
+def api_stats():
+    dimension = request.args.get('dimension', 'status')
+    if dimension not in DIMENSIONS + ('total',):
+        return jsonify({'error': f"dimension must be one of: {', '.join(DIMENSIONS + ('total',))}"}), 400
+    start, end = _report_window()
+    
+    day, snapshot = latest_snapshot()
+    return jsonify({
+        'latest': {'day': day.isoformat() if day else None, 'counts': snapshot},
+        'dimension': dimension,
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        **trend(dimension, start, end)
+    })
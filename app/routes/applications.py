@@ -1,17 +1,31 @@
 # filename: app/routes/applications.py
 from flask import render_template, redirect, url_for, flash, request, jsonify, current_app, send_from_directory
 from flask_login import login_required, current_user
-from sqlalchemy import or_
 from datetime import datetime, date, timedelta
 import os
+import mimetypes
+from urllib.parse import quote
 from werkzeug.utils import secure_filename
 from app import db
 from app.routes import applications_bp
 from app.models import Application, Task, Document
 from app.forms import ApplicationForm
+from app.utils import get_status_color, format_date
+from app.services.pagination import SORT_COLUMNS, KeysetPage, paginate
+from app.services.search import filter_by_search, rank_by_search, typeahead
+from app.services.stats import get_similar_applications
+from app.services.details import load_application_detail
+from app.services.versions import conditional_view
+from app.services.database import read_only
+from app.services.blobstore import store_upload
+from app.services.importer import detect_format, import_applications
+from app.services.bulk import (validate_items, bulk_update_status, bulk_delete_applications,
+                               bulk_toggle_tasks, bulk_create_tasks)
 
 @applications_bp.route('/')
+@read_only
 @login_required
+@conditional_view
 def list():
     # Get filter parameters
     status_filter = request.args.get('status', 'all')
@@ -19,6 +33,12 @@ def list():
     country_filter = request.args.get('country', 'all')
     search_query = request.args.get('q', '')
     sort_by = request.args.get('sort', 'deadline')
+    if sort_by not in SORT_COLUMNS and sort_by != 'relevance':
+        sort_by = 'deadline'
+    
+    # Page size is clamped so a crafted URL can't pull the whole table
+    per_page = request.args.get('per_page', current_app.config['APPLICATIONS_PER_PAGE'], type=int)
+    per_page = max(1, min(per_page, current_app.config['APPLICATIONS_MAX_PER_PAGE']))
     
     # Base query
     query = Application.query.filter_by(user_id=current_user.id)
@@ -33,35 +53,37 @@ def list():
     if country_filter != 'all':
         query = query.filter_by(country=country_filter)
     
-    # Apply search
-    if search_query:
-        search = f"%{search_query}%"
-        query = query.filter(or_(
-            Application.title.ilike(search),
-            Application.institution.ilike(search),
-            Application.program_role.ilike(search)
-        ))
-    
-    # Apply sorting
-    if sort_by == 'deadline':
-        query = query.order_by(Application.deadline.asc())
-    elif sort_by == 'created':
-        query = query.order_by(Application.created_at.desc())
-    elif sort_by == 'status':
-        query = query.order_by(Application.status.asc())
-    elif sort_by == 'title':
-        query = query.order_by(Application.title.asc())
-    
-    applications = query.all()
+    # Best-match ordering only makes sense with a search term; it returns a
+    # single ranked page rather than a cursor-paged list
+    if sort_by == 'relevance' and search_query:
+        total = filter_by_search(query, current_user.id, search_query).order_by(None).count()
+        page = KeysetPage(rank_by_search(query, current_user.id, search_query, per_page))
+    else:
+        if sort_by == 'relevance':
+            sort_by = 'deadline'
+        
+        # Apply search
+        if search_query:
+            query = filter_by_search(query, current_user.id, search_query)
+        
+        total = query.order_by(None).count()
+        
+        # Apply sorting and keyset pagination
+        page = paginate(query, sort_by, per_page,
+                        after=request.args.get('after'),
+                        before=request.args.get('before'))
     
     return render_template('applications/list.html',
-                         applications=applications,
+                         applications=page.items,
+                         page=page,
+                         total=total,
                          current_filters={
                              'status': status_filter,
                              'type': type_filter,
                              'country': country_filter,
                              'search': search_query,
-                             'sort': sort_by
+                             'sort': sort_by,
+                             'per_page': per_page
                          })
 
 @applications_bp.route('/create', methods=['GET', 'POST'])
@@ -95,17 +117,92 @@ def create():
     
     return render_template('applications/create.html', form=form)
 
+@applications_bp.route('/import', methods=['POST'])
+@login_required
+def import_file():
+    wants_json = request.args.get('format') == 'json' or \
+        request.accept_mimetypes.best == 'application/json'
+    
+    file = request.files.get('file')
+    fmt, gzipped = detect_format(file.filename if file else None)
+    if fmt is None:
+        message = 'Upload a .csv, .jsonl or .json file (optionally .gz compressed)'
+        if wants_json:
+            return jsonify({'error': message}), 400
+        flash(message, 'danger')
+        return redirect(url_for('applications.list'))
+    
+    report = import_applications(current_user.id, file.stream, fmt, gzipped)
+    
+    if wants_json:
+        return jsonify(report.to_dict())
+    
+    if report.rejected:
+        first = report.errors[0]
+        where = f"row {first['row']}" if first['row'] else 'file'
+        flash(f"Imported {report.imported} applications; {report.rejected} rejected "
+              f"({where}: {'; '.join(first['errors'])})", 'warning')
+    else:
+        flash(f'Imported {report.imported} applications.', 'success')
+    return redirect(url_for('applications.list'))
+
 @applications_bp.route('/<int:id>')
 @login_required
 def view(id):
-    application = Application.query.get_or_404(id)
+    detail = load_application_detail(id)
+    application = detail.application
     
     # Ensure user owns this application
     if application.user_id != current_user.id:
         flash('Access denied.', 'danger')
         return redirect(url_for('applications.list'))
     
-    return render_template('applications/view.html', application=application)
+    similar = get_similar_applications(application, current_app.config['SIMILAR_APPLICATIONS_LIMIT'])
+    
+    return render_template('applications/view.html', application=application, detail=detail, similar=similar)
+
+@applications_bp.route('/api/search')
+@read_only
+@login_required
+@conditional_view
+def api_search():
+    # Live search for the list page: the matching rows, with just the
+    # columns its table shows, so the page can update the table in place
+    search_query = request.args.get('q', '').strip()
+    limit = request.args.get('limit', current_app.config['TYPEAHEAD_LIMIT'], type=int)
+    limit = max(1, min(limit, current_app.config['TYPEAHEAD_MAX_LIMIT']))
+    filters = {attr: request.args[arg]
+               for arg, attr in (('status', 'status'), ('type', 'application_type'), ('country', 'country'))
+               if request.args.get(arg, 'all') != 'all'}
+    
+    today = date.today()
+    results = []
+    for row in typeahead(current_user.id, search_query, limit, filters):
+        result = dict(row._mapping)
+        result.update({
+            'deadline': row.deadline.isoformat() if row.deadline else None,
+            'deadline_display': format_date(row.deadline),
+            'days_remaining': (row.deadline - today).days if row.deadline else None,
+            'status_color': get_status_color(row.status),
+            'url': url_for('applications.view', id=row.id),
+            'edit_url': url_for('applications.edit', id=row.id),
+            'duplicate_url': url_for('applications.duplicate', id=row.id),
+            'delete_url': url_for('applications.delete', id=row.id),
+        })
+        results.append(result)
+    
+    return jsonify({'query': search_query, 'results': results})
+
+@applications_bp.route('/api/<int:id>')
+@login_required
+def api_detail(id):
+    detail = load_application_detail(id)
+    
+    # Ensure user owns this application
+    if detail.application.user_id != current_user.id:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    return jsonify(detail.to_dict())
 
 @applications_bp.route('/<int:id>/edit', methods=['GET', 'POST'])
 @login_required
@@ -209,11 +306,99 @@ def update_status(id):
 
 from app.utils import get_status_color
 
+# --- Bulk Routes ---
+def _bulk_payload(key):
+    """
+    Returns (body, error_response) for a bulk request, enforcing that the
+    body is a JSON object whose `key` is a list no longer than
+    BULK_MAX_ITEMS. Read every other field from the returned body.
+    """
+    data = request.get_json(silent=True)
+    if data is None:
+        data = {}
+    if not isinstance(data, dict):
+        return None, (jsonify({'error': 'Request body must be a JSON object'}), 400)
+    error = validate_items(key, data.get(key), current_app.config['BULK_MAX_ITEMS'])
+    if error:
+        return None, (jsonify({'error': error}), 400)
+    return data, None
+
+def _bulk_response(results):
+    return jsonify({
+        'success': all(result['success'] for result in results),
+        'applied': sum(1 for result in results if result['success']),
+        'results': results
+    })
+
+@applications_bp.route('/bulk/status', methods=['POST'])
+@login_required
+def bulk_status():
+    data, error = _bulk_payload('ids')
+    if error:
+        return error
+    
+    new_status = data.get('status')
+    if new_status not in current_app.config['STATUS_CHOICES']:
+        return jsonify({'error': 'Invalid status'}), 400
+    
+    return _bulk_response(bulk_update_status(current_user.id, data['ids'], new_status))
+
+@applications_bp.route('/bulk/delete', methods=['POST'])
+@login_required
+def bulk_delete():
+    data, error = _bulk_payload('ids')
+    if error:
+        return error
+    
+    return _bulk_response(bulk_delete_applications(current_user.id, data['ids']))
+
+@applications_bp.route('/task/bulk/toggle', methods=['POST'])
+@login_required
+def bulk_toggle_task():
+    data, error = _bulk_payload('ids')
+    if error:
+        return error
+    
+    is_completed = data.get('is_completed')
+    if is_completed is not None and not isinstance(is_completed, bool):
+        return jsonify({'error': 'is_completed must be true, false or omitted'}), 400
+    
+    return _bulk_response(bulk_toggle_tasks(current_user.id, data['ids'], is_completed))
+
+@applications_bp.route('/task/bulk/create', methods=['POST'])
+@login_required
+def bulk_create_task():
+    data, error = _bulk_payload('tasks')
+    if error:
+        return error
+    
+    return _bulk_response(bulk_create_tasks(current_user.id, data['tasks']))
+
 # --- Document Helper Functions ---
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in current_app.config['ALLOWED_EXTENSIONS']
 
+def accel_redirect_response(document):
+    """
+    Hands the transfer to an nginx `internal` location mapped onto
+    UPLOAD_FOLDER. nginx serves the bytes (including Range requests); only
+    conditional request checks happen here.
+    """
+    prefix = current_app.config['DOWNLOAD_ACCEL_REDIRECT_PREFIX'].rstrip('/')
+    mimetype = mimetypes.guess_type(document.filename)[0] or 'application/octet-stream'
+    
+    response = current_app.response_class(mimetype=mimetype)
+    response.automatically_set_content_length = False
+    response.headers['X-Accel-Redirect'] = f"{prefix}/{quote(document.filepath.replace(os.sep, '/'))}"
+    response.headers.set('Content-Disposition', 'attachment', filename=document.filename)
+    if document.sha256:
+        response.set_etag(document.sha256)
+    if document.uploaded_at:
+        response.last_modified = document.uploaded_at
+    response.cache_control.max_age = current_app.config['DOWNLOAD_MAX_AGE']
+    return response.make_conditional(request)
+
 # --- Document Routes ---
 @applications_bp.route('/<int:id>/upload_document', methods=['POST'])
 @login_required
@@ -234,18 +419,16 @@ def upload_document(id):
     if file and allowed_file(file.filename):
         filename = secure_filename(file.filename)
         
-        # Create user specific directory
-        user_dir = os.path.join(current_app.config['UPLOAD_FOLDER'], str(current_user.id))
-        if not os.path.exists(user_dir):
-            os.makedirs(user_dir)
-            
-        filepath = os.path.join(user_dir, filename)
-        file.save(filepath)
+        # Store the content once, keyed by its hash; the Document row
+        # references the shared blob under the user's chosen filename
+        sha256, size, filepath = store_upload(file.stream, current_app.config['UPLOAD_FOLDER'])
         
         # Save to DB
         document = Document(
             filename=filename,
-            filepath=os.path.join(str(current_user.id), filename),
+            filepath=filepath,
+            size=size,
+            sha256=sha256,
             application_id=application.id
         )
         db.session.add(document)
@@ -265,10 +448,12 @@ def delete_document(doc_id):
         return jsonify({'error': 'Access denied'}), 403
         
     try:
-        # Remove file from system
-        full_path = os.path.join(current_app.config['UPLOAD_FOLDER'], document.filepath)
-        if os.path.exists(full_path):
-            os.remove(full_path)
+        # Blob-backed files are shared and reclaimed by collect_garbage once
+        # unreferenced; only files from before the blob store are removed here
+        if not document.sha256:
+            full_path = os.path.join(current_app.config['UPLOAD_FOLDER'], document.filepath)
+            if os.path.exists(full_path):
+                os.remove(full_path)
             
         db.session.delete(document)
         db.session.commit()
@@ -285,8 +470,25 @@ def download_document(doc_id):
     if document.application.user_id != current_user.id:
         return jsonify({'error': 'Access denied'}), 403
     
-    directory = os.path.join(current_app.config['UPLOAD_FOLDER'], str(current_user.id))
-    return send_from_directory(directory, document.filename, as_attachment=True)
+    # Blobs never change, so their content hash is a strong ETag; older
+    # files fall back to Flask's mtime/size based one
+    etag = document.sha256 or True
+    
+    if current_app.config['DOWNLOAD_ACCEL_REDIRECT_PREFIX']:
+        response = accel_redirect_response(document)
+    else:
+        # send_from_directory handles Range, If-None-Match and
+        # If-Modified-Since, and sends X-Sendfile when USE_X_SENDFILE is set.
+        # abspath so a relative UPLOAD_FOLDER resolves the same way as on upload
+        directory = os.path.abspath(current_app.config['UPLOAD_FOLDER'])
+        response = send_from_directory(directory, document.filepath,
+                                       as_attachment=True, download_name=document.filename,
+                                       etag=etag, max_age=current_app.config['DOWNLOAD_MAX_AGE'])
+    
+    # Downloads are per-user, so keep them out of shared caches
+    response.cache_control.private = True
+    response.cache_control.public = False
+    return response
 
 # --- Task Routes ---
 @applications_bp.route('/<int:id>/add_task', methods=['POST'])
@@ -1,11 +1,18 @@
 # filename: app/routes/auth.py
-from flask import render_template, redirect, url_for, flash, request
+from flask import render_template, redirect, url_for, flash, request, current_app
 from flask_login import login_user, logout_user, current_user, login_required
 from urllib.parse import urlparse
 from app import db
 from app.routes import auth_bp
 from app.models import User
-from app.forms import RegistrationForm, LoginForm
+from app.forms import RegistrationForm, LoginForm, ReminderSettingsForm
+from app.services.accounts import invalidate_user
+from app.services.passwords import PasswordHashingBusy
+from app.services.reminders import parse_offsets, refresh_next_reminders
+from app.services.calendar import new_token
+
+# Returned with 503 responses when the password hashing queue is full
+RETRY_AFTER_SECONDS = '5'
 
 @auth_bp.route('/register', methods=['GET', 'POST'])
 def register():
@@ -25,7 +32,11 @@ def register():
             return redirect(url_for('auth.register'))
         
         user = User(username=form.username.data, email=form.email.data)
-        user.set_password(form.password.data)
+        try:
+            user.set_password(form.password.data)
+        except PasswordHashingBusy:
+            flash('The server is busy. Please try again in a moment.', 'warning')
+            return render_template('auth/register.html', form=form), 503, {'Retry-After': RETRY_AFTER_SECONDS}
         db.session.add(user)
         db.session.commit()
         
@@ -43,10 +54,19 @@ def login():
     if form.validate_on_submit():
         user = User.query.filter_by(email=form.email.data).first()
         
-        if user is None or not user.check_password(form.password.data):
+        try:
+            valid = user is not None and user.check_password(form.password.data)
+        except PasswordHashingBusy:
+            flash('The server is busy. Please try again in a moment.', 'warning')
+            return render_template('auth/login.html', form=form), 503, {'Retry-After': RETRY_AFTER_SECONDS}
+        
+        if not valid:
             flash('Invalid email or password.', 'danger')
             return redirect(url_for('auth.login'))
         
+        # Saves a hash upgraded by check_password
+        db.session.commit()
+        
         remember = form.remember_me.data != '0'
         remember_days = int(form.remember_me.data) if remember else None
         login_user(user, remember=remember, duration=remember_days)
@@ -63,6 +83,41 @@ def login():
 @auth_bp.route('/logout')
 @login_required
 def logout():
+    invalidate_user(current_user.id)
     logout_user()
     flash('You have been logged out.', 'info')
-    return redirect(url_for('auth.login'))
\ No newline at end of file
+    return redirect(url_for('auth.login'))
+
+@auth_bp.route('/settings', methods=['GET', 'POST'])
+@login_required
+def settings():
+    form = ReminderSettingsForm()
+    if form.validate_on_submit():
+        current_user.timezone = form.timezone.data
+        current_user.reminder_hour = form.reminder_hour.data
+        current_user.reminder_offsets = ','.join(str(days) for days in parse_offsets(form.reminder_offsets.data))
+        db.session.flush()
+        refresh_next_reminders(user_id=current_user.id)
+        db.session.commit()
+        
+        flash('Reminder settings saved.', 'success')
+        return redirect(url_for('auth.settings'))
+    
+    if request.method == 'GET':
+        # Unset preferences show the app-wide defaults
+        form.timezone.data = current_user.timezone or 'UTC'
+        if current_user.reminder_hour is not None:
+            form.reminder_hour.data = current_user.reminder_hour
+        offsets = current_user.reminder_offsets or ','.join(map(str, current_app.config['REMINDER_INTERVALS']))
+        form.reminder_offsets.data = offsets.replace(',', ', ')
+    
+    return render_template('auth/settings.html', form=form)
+
+@auth_bp.route('/settings/calendar', methods=['POST'])
+@login_required
+def reset_calendar_token():
+    # A new token also revokes the old feed URL
+    current_user.calendar_token = new_token()
+    db.session.commit()
+    flash('Your calendar feed link has been updated.', 'success')
+    return redirect(url_for('auth.settings'))
@@ -1,96 +1,129 @@
 # filename: app/routes/dashboard.py
-from flask import render_template, jsonify, send_file
+from flask import render_template, jsonify, request, current_app, Response, stream_with_context, abort
 from flask_login import login_required, current_user
-from datetime import date, timedelta
+from datetime import date, timedelta, timezone
 from app.routes import dashboard_bp
 from app.models import Application
-from app.utils import export_applications_to_csv
-from io import BytesIO
+from app.services.versions import conditional_view
+from app.services.database import read_only
+from app.services.calendar import find_feed_owner, feed_etag, last_modified, get_feed
+from app.utils import iter_applications_csv, iter_applications_jsonl, gzip_chunks
+from app.services.stats import (DEADLINE_BUCKETS, count_by, get_deadline_counts,
+                                get_deadlines_between, get_overdue)
 
 @dashboard_bp.route('/')
 @dashboard_bp.route('/dashboard')
+@read_only
 @login_required
+@conditional_view
 def index():
-    applications = Application.query.filter_by(user_id=current_user.id).all()
-    
-    # Statistics
-    total = len(applications)
-    
-    # Group by status
-    status_counts = {}
-    for app in applications:
-        status_counts[app.status] = status_counts.get(app.status, 0) + 1
-    
-    # Group by type
-    type_counts = {}
-    for app in applications:
-        type_counts[app.application_type] = type_counts.get(app.application_type, 0) + 1
-    
-    # Upcoming deadlines
     today = date.today()
-    upcoming_7 = []
-    upcoming_14 = []
-    upcoming_30 = []
-    overdue = []
+    limit = current_app.config['DASHBOARD_LIST_LIMIT']
     
-    for app in applications:
-        if app.deadline:
-            days = (app.deadline - today).days
-            if days < 0:
-                overdue.append(app)
-            elif 0 <= days <= 7:
-                upcoming_7.append(app)
-            elif 8 <= days <= 14:
-                upcoming_14.append(app)
-            elif 15 <= days <= 30:
-                upcoming_30.append(app)
+    # Statistics (aggregated in the database)
+    status_counts = count_by(current_user.id, Application.status)
+    type_counts = count_by(current_user.id, Application.application_type)
+    deadline_counts = get_deadline_counts(current_user.id, today)
     
-    # Sort by urgency
-    overdue.sort(key=lambda x: x.deadline)
-    upcoming_7.sort(key=lambda x: x.deadline)
-    upcoming_14.sort(key=lambda x: x.deadline)
-    upcoming_30.sort(key=lambda x: x.deadline)
+    # Upcoming deadlines, soonest first; only the panels the template shows
+    upcoming = {}
+    for name in ('upcoming_7', 'upcoming_30'):
+        start, end = DEADLINE_BUCKETS[name]
+        upcoming[name] = get_deadlines_between(current_user.id,
+                                               today + timedelta(days=start),
+                                               today + timedelta(days=end),
+                                               limit=limit)
+    overdue = get_overdue(current_user.id, today, limit=limit)
     
     return render_template('dashboard.html',
-                         total=total,
+                         total=deadline_counts['total'],
                          status_counts=status_counts,
                          type_counts=type_counts,
+                         deadline_counts=deadline_counts,
                          overdue=overdue,
-                         upcoming_7=upcoming_7,
-                         upcoming_14=upcoming_14,
-                         upcoming_30=upcoming_30)
+                         upcoming_7=upcoming['upcoming_7'],
+                         upcoming_30=upcoming['upcoming_30'])
+
+EXPORT_FORMATS = {
+    'csv': (iter_applications_csv, 'text/csv'),
+    'jsonl': (iter_applications_jsonl, 'application/x-ndjson'),
+}
+
+def _stream_export(fmt):
+    """
+    Streams the current user's applications in `fmt`, pulling rows from the
+    database in EXPORT_BATCH_SIZE batches. Pass ?gzip=1 for a .gz download.
+    """
+    serializer, mimetype = EXPORT_FORMATS[fmt]
+    applications = Application.query.filter_by(user_id=current_user.id) \
+        .order_by(Application.deadline.asc(), Application.id.asc()) \
+        .yield_per(current_app.config['EXPORT_BATCH_SIZE'])
+    
+    chunks = serializer(applications)
+    filename = f'applications_export_{date.today()}.{fmt}'
+    
+    if request.args.get('gzip', type=int):
+        chunks = gzip_chunks(chunks)
+        mimetype = 'application/gzip'
+        filename += '.gz'
+    
+    response = Response(stream_with_context(chunks), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    # Let a buffering reverse proxy pass chunks straight through
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
 
 @dashboard_bp.route('/export/csv')
+@read_only
 @login_required
 def export_csv():
-    applications = Application.query.filter_by(user_id=current_user.id).all()
-    csv_data = export_applications_to_csv(applications)
-    
-    # Create in-memory file
-    mem = BytesIO()
-    mem.write(csv_data.encode('utf-8'))
-    mem.seek(0)
-    
-    filename = f'applications_export_{date.today()}.csv'
-    return send_file(mem,
-                    mimetype='text/csv',
-                    as_attachment=True,
-                    download_name=filename)
+    return _stream_export('csv')
+
+@dashboard_bp.route('/export/jsonl')
+@read_only
+@login_required
+def export_jsonl():
+    return _stream_export('jsonl')
 
 @dashboard_bp.route('/api/stats')
+@read_only
 @login_required
+@conditional_view
 def api_stats():
-    applications = Application.query.filter_by(user_id=current_user.id).all()
-    
-    status_counts = {}
-    type_counts = {}
-    
-    for app in applications:
-        status_counts[app.status] = status_counts.get(app.status, 0) + 1
-        type_counts[app.application_type] = type_counts.get(app.application_type, 0) + 1
+    status_counts = count_by(current_user.id, Application.status)
+    type_counts = count_by(current_user.id, Application.application_type)
     
     return jsonify({
-        'total': len(applications),
+        'total': sum(status_counts.values()),
         'status_counts': status_counts,
         'type_counts': type_counts
-    })
\ No newline at end of file
+    })
+
+@dashboard_bp.route('/calendar/<token>.ics')
+@read_only
+def calendar_feed(token):
+    """
+    The user's deadlines as an iCalendar feed for calendar apps, which poll
+    it. Authenticated by the secret token in the URL rather than a session.
+    Unchanged data is answered with 304 after a single indexed lookup.
+    """
+    owner = find_feed_owner(token)
+    if owner is None:
+        abort(404)
+    
+    etag = feed_etag(owner.id, owner.data_version)
+    modified = last_modified(owner).replace(microsecond=0, tzinfo=timezone.utc)
+    if request.if_none_match:
+        not_modified = request.if_none_match.contains(etag)
+    else:
+        not_modified = request.if_modified_since is not None and request.if_modified_since >= modified
+    
+    if not_modified:
+        response = current_app.response_class(status=304)
+    else:
+        response = Response(get_feed(owner), mimetype='text/calendar')
+        response.headers['Content-Disposition'] = 'inline; filename="apptrack.ics"'
+    response.set_etag(etag)
+    response.last_modified = modified
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
@@ -0,0 +1,49 @@
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import make_transient_to_detached
+from app import db
+from app.models import User
+from app.services.fragments import MemoryBackend
+
+# Columns kept in the user cache. data_version is deliberately left out: it
+# changes on every write and is always read from the database.
+CACHED_COLUMNS = ('id', 'username', 'email', 'password_hash', 'created_at')
+
+def load_cached_user(user_id):
+    """
+    Flask-Login user loader backed by a short-TTL per-process LRU. A hit is
+    merged into the session's identity map without a query, so the result
+    behaves like any loaded User. Other workers see updates within
+    USER_CACHE_TTL seconds.
+    """
+    cache = current_app.extensions.get('user_cache')
+    if cache is None:
+        return db.session.get(User, user_id)
+
+    values = cache.get(user_id)
+    if values is None:
+        user = db.session.get(User, user_id)
+        if user is not None:
+            cache.set(user_id, {column: getattr(user, column) for column in CACHED_COLUMNS},
+                      current_app.config['USER_CACHE_TTL'])
+        return user
+
+    user = User(**values)
+    make_transient_to_detached(user)
+    return db.session.merge(user, load=False)
+
+def invalidate_user(user_id):
+    if has_app_context():
+        cache = current_app.extensions.get('user_cache')
+        if cache is not None:
+            cache.delete(user_id)
+
+@event.listens_for(db.session, 'after_flush')
+def invalidate_changed_users(session, flush_context):
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User) and (obj in session.deleted or session.is_modified(obj)):
+            invalidate_user(obj.id)
+
+def init_user_cache(app):
+    if app.config.get('USER_CACHE_TTL'):
+        app.extensions['user_cache'] = MemoryBackend(app.config['USER_CACHE_MAX_ENTRIES'])
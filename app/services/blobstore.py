@@ -0,0 +1,187 @@
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from sqlalchemy import delete, event, text
+from app import db
+from app.models import Blob, Document
+
+logger = logging.getLogger(__name__)
+
+BLOB_DIR = 'blobs'
+CHUNK_SIZE = 64 * 1024
+
+def blob_path(sha256):
+    """
+    Path of a blob relative to UPLOAD_FOLDER, fanned out over two directory
+    levels so no single directory grows too large.
+    """
+    return os.path.join(BLOB_DIR, sha256[:2], sha256[2:4], sha256)
+
+def store_upload(stream, upload_folder):
+    """
+    Copies `stream` into the blob store, hashing it on the way through.
+    The file is always renamed into place, even when the content is already
+    stored: that gives it a fresh mtime, which keeps collect_garbage off it
+    until the Document referencing it has been committed, and restores it
+    if a collection removed it meanwhile. Returns (sha256, size, relative
+    path).
+    """
+    tmp_dir = os.path.join(upload_folder, BLOB_DIR, 'tmp')
+    os.makedirs(tmp_dir, exist_ok=True)
+
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+    try:
+        with os.fdopen(fd, 'wb') as tmp:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                tmp.write(chunk)
+                size += len(chunk)
+
+        sha256 = digest.hexdigest()
+        relpath = blob_path(sha256)
+        full_path = os.path.join(upload_folder, relpath)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        os.replace(tmp_path, full_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return sha256, size, relpath
+
+def adjust_ref_counts(connection, deltas, sizes, now=None):
+    """
+    Applies {sha256: delta} to blob reference counts, creating blob rows on
+    first reference. `sizes` supplies the size for any new rows.
+    """
+    now = now or datetime.utcnow()
+    for sha256, delta in deltas.items():
+        if not delta:
+            continue
+        result = connection.execute(
+            text('UPDATE blob SET ref_count = ref_count + :delta, updated_at = :now WHERE sha256 = :sha256'),
+            {'delta': delta, 'now': now, 'sha256': sha256}
+        )
+        if result.rowcount == 0 and delta > 0:
+            connection.execute(Blob.__table__.insert().values(
+                sha256=sha256, size=sizes.get(sha256) or 0, ref_count=delta, created_at=now, updated_at=now
+            ))
+
+def _remove_stale(upload_folder, relpath, cutoff):
+    """
+    Unlinks a blob file unless it was written after `cutoff`. The file is
+    first renamed aside, so an upload renaming the same content into place
+    at the same moment either lands after the rename (and is kept) or is
+    the file renamed aside (and its fresh mtime puts it back).
+    """
+    full_path = os.path.join(upload_folder, relpath)
+    aside = os.path.join(upload_folder, BLOB_DIR, 'tmp', f'{os.path.basename(relpath)}.gc')
+    try:
+        os.replace(full_path, aside)
+    except FileNotFoundError:
+        return False
+    if os.stat(aside).st_mtime >= cutoff:
+        os.replace(aside, full_path)
+        return False
+    os.remove(aside)
+    return True
+
+def collect_garbage(upload_folder, grace=timedelta(hours=1)):
+    """
+    Deletes blobs that have had no references for at least `grace`, then
+    their files, and sweeps files with no blob row at all (left by uploads
+    whose Document was never committed) once they are older than `grace`.
+    A row is only deleted if it is still unreferenced at that moment, and
+    a file only if its row was deleted here and nothing has rewritten it
+    within the grace period. Returns the number of blobs removed.
+    """
+    os.makedirs(os.path.join(upload_folder, BLOB_DIR, 'tmp'), exist_ok=True)
+    cutoff = datetime.utcnow() - grace
+    file_cutoff = time.time() - grace.total_seconds()
+    table = Blob.__table__
+
+    candidates = [sha256 for sha256, in db.session.query(Blob.sha256)
+                  .filter(Blob.ref_count <= 0, Blob.updated_at < cutoff)]
+    deleted = []
+    for sha256 in candidates:
+        result = db.session.execute(delete(table).where(
+            table.c.sha256 == sha256, table.c.ref_count <= 0, table.c.updated_at < cutoff))
+        if result.rowcount:
+            deleted.append(sha256)
+    db.session.commit()
+
+    removed = 0
+    for sha256 in deleted:
+        removed += _remove_stale(upload_folder, blob_path(sha256), file_cutoff)
+    removed += sweep_orphans(upload_folder, file_cutoff)
+    if removed:
+        logger.info("Removed %d unreferenced blob file(s)", removed)
+    return removed
+
+def sweep_orphans(upload_folder, cutoff):
+    """
+    Removes blob files with no blob row that were last written before
+    `cutoff` (a timestamp), and temporary files abandoned by interrupted
+    uploads. Returns the number of blob files removed.
+    """
+    root = os.path.join(upload_folder, BLOB_DIR)
+    tmp_dir = os.path.join(root, 'tmp')
+    for entry in os.scandir(tmp_dir):
+        if entry.is_file() and entry.stat().st_mtime < cutoff:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+    removed = 0
+    for directory, subdirs, names in os.walk(root):
+        if directory == root:
+            subdirs[:] = [name for name in subdirs if name != 'tmp']
+            continue
+        if not names:
+            continue
+        known = {sha256 for sha256, in db.session.query(Blob.sha256).filter(Blob.sha256.in_(names))}
+        for name in names:
+            if name not in known:
+                relpath = os.path.relpath(os.path.join(directory, name), upload_folder)
+                removed += _remove_stale(upload_folder, relpath, cutoff)
+    return removed
+
+@event.listens_for(db.session, 'before_flush')
+def acquire_blob_references(session, flush_context, instances):
+    """
+    Counts references from new Documents before they are inserted, so the
+    blob row they point at always exists first.
+    """
+    deltas = Counter()
+    sizes = {}
+    for obj in session.new:
+        if isinstance(obj, Document) and obj.sha256:
+            deltas[obj.sha256] += 1
+            sizes[obj.sha256] = obj.size
+
+    if deltas:
+        adjust_ref_counts(session.connection(), deltas, sizes)
+
+@event.listens_for(db.session, 'after_flush')
+def release_blob_references(session, flush_context):
+    """
+    Drops references for deleted Documents, including those removed by an
+    Application cascade delete, which are only known once the flush has run.
+    """
+    deltas = Counter()
+    for obj in session.deleted:
+        if isinstance(obj, Document) and obj.sha256:
+            deltas[obj.sha256] -= 1
+
+    if deltas:
+        adjust_ref_counts(session.connection(), deltas, {})
@@ -0,0 +1,174 @@
+import os
+from collections import Counter
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import func, insert
+from app import db
+from app.models import Application, Task, Document, ReminderLog
+from app.services.search import search_index_available, refresh_search_index
+from app.services.blobstore import adjust_ref_counts
+from app.services.versions import bump_data_version
+from app.services.reminders import refresh_next_reminders
+from app.services.counters import apply_deltas, recount
+
+def validate_items(key, items, max_items):
+    """
+    Returns an error message if `items` is not a usable bulk payload.
+    """
+    if not isinstance(items, list) or not items:
+        return f'{key} must be a non-empty list'
+    if len(items) > max_items:
+        return f'At most {max_items} items per request'
+    return None
+
+def _parse_ids(ids):
+    """
+    Normalises a client-supplied id list, preserving order and dropping
+    duplicates. Non-integers are reported back as errors, not raised.
+    """
+    parsed, invalid = [], []
+    seen = set()
+    for raw in ids:
+        try:
+            ident = int(raw)
+        except (TypeError, ValueError):
+            invalid.append(raw)
+            continue
+        if ident not in seen:
+            seen.add(ident)
+            parsed.append(ident)
+    return parsed, invalid
+
+def _results(requested, applied, invalid, error='Not found'):
+    results = [{'id': raw, 'success': False, 'error': 'Invalid id'} for raw in invalid]
+    for ident in requested:
+        if ident in applied:
+            results.append({'id': ident, 'success': True})
+        else:
+            results.append({'id': ident, 'success': False, 'error': error})
+    return results
+
+def owned_application_ids(user_id, ids):
+    """
+    Returns the subset of `ids` that are applications owned by `user_id`,
+    checked with a single query.
+    """
+    if not ids:
+        return set()
+    rows = db.session.query(Application.id) \
+        .filter(Application.user_id == user_id, Application.id.in_(ids)).all()
+    return {ident for ident, in rows}
+
+def owned_task_ids(user_id, ids):
+    if not ids:
+        return set()
+    rows = db.session.query(Task.id) \
+        .join(Application, Task.application_id == Application.id) \
+        .filter(Application.user_id == user_id, Task.id.in_(ids)).all()
+    return {ident for ident, in rows}
+
+def bulk_update_status(user_id, ids, status):
+    requested, invalid = _parse_ids(ids)
+    owned = owned_application_ids(user_id, requested)
+    if owned:
+        Application.query.filter(Application.id.in_(owned)) \
+            .update({'status': status, 'updated_at': datetime.utcnow()}, synchronize_session=False)
+        refresh_next_reminders(application_ids=owned)
+        bump_data_version(db.session.connection(), [user_id])
+    db.session.commit()
+    return _results(requested, owned, invalid)
+
+def bulk_delete_applications(user_id, ids):
+    """
+    Deletes applications and their dependent rows with set-based DELETEs.
+    These bypass the ORM flush hooks, so blob references and the search
+    index are adjusted explicitly in the same transaction. Files from
+    before the blob store belong to a single document and are removed once
+    the delete has committed, as delete_document does.
+    """
+    requested, invalid = _parse_ids(ids)
+    owned = owned_application_ids(user_id, requested)
+    legacy_files = []
+    if owned:
+        connection = db.session.connection()
+
+        legacy_files = [filepath for filepath, in db.session.query(Document.filepath)
+                        .filter(Document.application_id.in_(owned), Document.sha256.is_(None))]
+
+        released = db.session.query(Document.sha256, func.count(Document.id)) \
+            .filter(Document.application_id.in_(owned), Document.sha256.isnot(None)) \
+            .group_by(Document.sha256).all()
+        adjust_ref_counts(connection, Counter({sha256: -count for sha256, count in released}), {})
+
+        for model in (Task, Document, ReminderLog):
+            model.query.filter(model.application_id.in_(owned)).delete(synchronize_session=False)
+        Application.query.filter(Application.id.in_(owned)).delete(synchronize_session=False)
+
+        if search_index_available(connection):
+            refresh_search_index(connection, owned)
+        bump_data_version(connection, [user_id])
+    db.session.commit()
+
+    upload_folder = current_app.config['UPLOAD_FOLDER']
+    for filepath in legacy_files:
+        try:
+            os.remove(os.path.join(upload_folder, filepath))
+        except FileNotFoundError:
+            pass
+    return _results(requested, owned, invalid)
+
+def bulk_toggle_tasks(user_id, ids, is_completed=None):
+    """
+    Sets `is_completed` on the given tasks, or flips each one when
+    `is_completed` is None.
+    """
+    requested, invalid = _parse_ids(ids)
+    owned = owned_task_ids(user_id, requested)
+    if owned:
+        value = bool(is_completed) if is_completed is not None else ~func.coalesce(Task.is_completed, False)
+        Task.query.filter(Task.id.in_(owned)) \
+            .update({'is_completed': value}, synchronize_session=False)
+        application_ids = {ident for ident, in db.session.query(Task.application_id)
+                           .filter(Task.id.in_(owned)).distinct()}
+        recount(db.session.connection(), application_ids)
+        bump_data_version(db.session.connection(), [user_id])
+    db.session.commit()
+    return _results(requested, owned, invalid)
+
+def bulk_create_tasks(user_id, items):
+    """
+    Creates tasks from [{'application_id': .., 'description': ..}, ...] with
+    one executemany INSERT. Results are reported per input item, by index.
+    """
+    requested, _ = _parse_ids(item.get('application_id') for item in items if isinstance(item, dict))
+    owned = owned_application_ids(user_id, requested)
+
+    rows, results = [], []
+    now = datetime.utcnow()
+    for index, item in enumerate(items):
+        item = item if isinstance(item, dict) else {}
+        description = (item.get('description') or '').strip()
+        try:
+            application_id = int(item.get('application_id'))
+        except (TypeError, ValueError):
+            application_id = None
+
+        if application_id not in owned:
+            results.append({'index': index, 'success': False, 'error': 'Application not found'})
+        elif not description or len(description) > 200:
+            results.append({'index': index, 'success': False, 'error': 'Description must be 1-200 characters'})
+        else:
+            rows.append({'application_id': application_id, 'description': description,
+                         'is_completed': False, 'created_at': now})
+            results.append({'index': index, 'success': True})
+
+    if rows:
+        db.session.execute(insert(Task), rows)
+        connection = db.session.connection()
+        apply_deltas(connection, {application_id: Counter(task_count=count) for application_id, count
+                                  in Counter(row['application_id'] for row in rows).items()})
+        if search_index_available(connection):
+            refresh_search_index(connection, {row['application_id'] for row in rows})
+        bump_data_version(connection, [user_id])
+    db.session.commit()
+    return results
@@ -0,0 +1,141 @@
+import hashlib
+import secrets
+from datetime import datetime, timedelta
+from flask import current_app
+from app import db
+from app.models import Application, Task, User
+from app.services.metrics import FRAGMENT_CACHE
+from app.services.versions import release_id
+
+PRODID = '-//AppTrack Pro//Deadlines//EN'
+
+def new_token():
+    return secrets.token_urlsafe(32)
+
+def find_feed_owner(token):
+    """
+    Returns the owner's id, data_version, data_changed_at and created_at
+    for a feed token, or None. Only these columns are read, so a poll that
+    ends in a 304 costs a single indexed lookup.
+    """
+    if not token:
+        return None
+    return db.session.query(User.id, User.data_version, User.data_changed_at, User.created_at) \
+        .filter(User.calendar_token == token).first()
+
+def feed_etag(user_id, version):
+    raw = '|'.join([release_id(), str(user_id), str(version)])
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+def last_modified(owner):
+    return owner.data_changed_at or owner.created_at or datetime(1970, 1, 1)
+
+def _escape(text):
+    return (text or '').replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,') \
+        .replace('\r\n', '\\n').replace('\n', '\\n').replace('\r', '')
+
+def _fold(line):
+    # Lines longer than 75 octets continue on lines starting with a space,
+    # never splitting a UTF-8 sequence (RFC 5545, 3.1)
+    parts = []
+    current, size = '', 0
+    for char in line:
+        width = len(char.encode('utf-8'))
+        if size + width > 75:
+            parts.append(current)
+            current, size = ' ', 1
+        current += char
+        size += width
+    parts.append(current)
+    return '\r\n'.join(parts)
+
+def _stamp(value):
+    return value.strftime('%Y%m%dT%H%M%SZ')
+
+def _day(value):
+    return value.strftime('%Y%m%d')
+
+def render_feed(user_id, generated_at):
+    """
+    Renders the user's feed: an all-day VEVENT per application deadline and
+    a VTODO per open task, due on its application's deadline. DTSTAMP is
+    the time the user's data last changed, so the same data always renders
+    to the same bytes.
+    """
+    config = current_app.config
+    host = config.get('SERVER_NAME') or 'apptrack.local'
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{PRODID}',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        'X-WR-CALNAME:AppTrack Pro deadlines',
+        f"REFRESH-INTERVAL;VALUE=DURATION:PT{config['CALENDAR_REFRESH_MINUTES']}M",
+        f"X-PUBLISHED-TTL:PT{config['CALENDAR_REFRESH_MINUTES']}M",
+    ]
+
+    applications = db.session.query(
+        Application.id, Application.title, Application.institution, Application.program_role,
+        Application.status, Application.deadline, Application.application_url, Application.updated_at
+    ).filter(Application.user_id == user_id, Application.deadline.isnot(None)) \
+        .order_by(Application.deadline, Application.id).all()
+    for application in applications:
+        details = [f'Status: {application.status}']
+        if application.program_role:
+            details.append(f'Program/Role: {application.program_role}')
+        lines += [
+            'BEGIN:VEVENT',
+            f'UID:application-{application.id}@{host}',
+            f'DTSTAMP:{_stamp(generated_at)}',
+            f'DTSTART;VALUE=DATE:{_day(application.deadline)}',
+            f'DTEND;VALUE=DATE:{_day(application.deadline + timedelta(days=1))}',
+            f'SUMMARY:{_escape(f"Deadline: {application.title} ({application.institution})")}',
+            f"DESCRIPTION:{_escape(chr(10).join(details))}",
+            'TRANSP:TRANSPARENT',
+        ]
+        if application.application_url:
+            lines.append(f'URL:{application.application_url}')
+        if application.updated_at:
+            lines.append(f'LAST-MODIFIED:{_stamp(application.updated_at)}')
+        lines.append('END:VEVENT')
+
+    tasks = db.session.query(Task.id, Task.description, Task.created_at, Task.application_id,
+                             Application.title, Application.deadline) \
+        .join(Application, Task.application_id == Application.id) \
+        .filter(Application.user_id == user_id, Task.is_completed.isnot(True)) \
+        .order_by(Task.application_id, Task.id).all()
+    for task in tasks:
+        lines += [
+            'BEGIN:VTODO',
+            f'UID:task-{task.id}@{host}',
+            f'DTSTAMP:{_stamp(generated_at)}',
+            f'SUMMARY:{_escape(task.description)}',
+            f'DESCRIPTION:{_escape(task.title)}',
+            f'RELATED-TO:application-{task.application_id}@{host}',
+            'STATUS:NEEDS-ACTION',
+        ]
+        if task.deadline:
+            lines.append(f'DUE;VALUE=DATE:{_day(task.deadline)}')
+        lines.append('END:VTODO')
+
+    lines.append('END:VCALENDAR')
+    return '\r\n'.join(_fold(line) for line in lines) + '\r\n'
+
+def get_feed(owner):
+    """
+    The rendered feed for a row from find_feed_owner, from the fragment
+    cache backend when this data version was rendered before. Entries are
+    keyed by data version, so any write makes older ones unreachable.
+    """
+    cache = current_app.extensions['fragment_cache'].backend
+    key = f'calendar:{feed_etag(owner.id, owner.data_version)}'
+    body = cache.get(key)
+    if body is not None:
+        FRAGMENT_CACHE.inc(fragment='calendar_feed', result='hit')
+        return body
+
+    FRAGMENT_CACHE.inc(fragment='calendar_feed', result='miss')
+    body = render_feed(owner.id, last_modified(owner))
+    cache.set(key, body, current_app.config.get('FRAGMENT_CACHE_TTL', 3600))
+    return body
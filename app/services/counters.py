@@ -0,0 +1,117 @@
+from collections import Counter, defaultdict
+from sqlalchemy import event, func, inspect, or_, select, update
+from app import db
+from app.models import Application, Task, Document
+from app.services.versions import bump_data_version
+
+# Keeps IN lists well under SQLite's bound parameter limit
+REPAIR_BATCH_SIZE = 500
+
+COUNTER_COLUMNS = ('task_count', 'completed_task_count', 'document_count', 'document_bytes')
+
+def _committed(obj, key):
+    # The value as last loaded from the database, before any pending change
+    history = inspect(obj).attrs[key].history
+    if history.deleted:
+        return history.deleted[0]
+    return history.unchanged[0] if history.unchanged else getattr(obj, key)
+
+def collect_deltas(session):
+    """
+    {application_id: Counter(column=delta)} for the Tasks and Documents
+    inserted, deleted or completed/reopened in the current flush.
+    """
+    deltas = defaultdict(Counter)
+    # Children removed along with their application need no bookkeeping
+    deleted_applications = {obj.id for obj in session.deleted if isinstance(obj, Application)}
+    for obj in session.new:
+        if isinstance(obj, Task):
+            deltas[obj.application_id].update(task_count=1, completed_task_count=int(bool(obj.is_completed)))
+        elif isinstance(obj, Document):
+            deltas[obj.application_id].update(document_count=1, document_bytes=obj.size or 0)
+
+    for obj in session.deleted:
+        if getattr(obj, 'application_id', None) in deleted_applications:
+            continue
+        if isinstance(obj, Task):
+            deltas[obj.application_id].subtract(task_count=1,
+                                                completed_task_count=int(bool(_committed(obj, 'is_completed'))))
+        elif isinstance(obj, Document):
+            deltas[obj.application_id].subtract(document_count=1, document_bytes=_committed(obj, 'size') or 0)
+
+    for obj in session.dirty:
+        if isinstance(obj, Task) and obj not in session.deleted:
+            history = inspect(obj).attrs.is_completed.history
+            if history.has_changes():
+                before = bool(history.deleted[0]) if history.deleted else False
+                deltas[obj.application_id]['completed_task_count'] += int(bool(obj.is_completed)) - int(before)
+
+    deltas.pop(None, None)
+    return {ident: counts for ident, counts in deltas.items() if any(counts.values())}
+
+def apply_deltas(connection, deltas):
+    """
+    Adds the deltas to the counter columns with relative UPDATEs, so
+    concurrent writers never overwrite each other's counts. updated_at is
+    left alone: attaching a file is not an edit of the application.
+    """
+    table = Application.__table__
+    for application_id, counts in deltas.items():
+        values = {column: table.c[column] + delta for column, delta in counts.items() if delta}
+        if values:
+            connection.execute(update(table).where(table.c.id == application_id)
+                               .values(updated_at=table.c.updated_at, **values))
+
+@event.listens_for(db.session, 'after_flush')
+def maintain_counters(session, flush_context):
+    deltas = collect_deltas(session)
+    if not deltas:
+        return
+    apply_deltas(session.connection(), deltas)
+    # Loaded applications now hold stale counts; reload them on next access
+    for application_id in deltas:
+        application = session.identity_map.get(session.identity_key(Application, application_id))
+        if application is not None:
+            session.expire(application, COUNTER_COLUMNS)
+
+def _actual_counts():
+    table = Application.__table__
+    tasks = Task.__table__
+    documents = Document.__table__
+    return {
+        'task_count': select(func.count(tasks.c.id))
+            .where(tasks.c.application_id == table.c.id).scalar_subquery(),
+        'completed_task_count': select(func.count(tasks.c.id))
+            .where(tasks.c.application_id == table.c.id, tasks.c.is_completed.is_(True)).scalar_subquery(),
+        'document_count': select(func.count(documents.c.id))
+            .where(documents.c.application_id == table.c.id).scalar_subquery(),
+        'document_bytes': select(func.coalesce(func.sum(documents.c.size), 0))
+            .where(documents.c.application_id == table.c.id).scalar_subquery(),
+    }
+
+def recount(connection, application_ids=None):
+    """
+    Recomputes the counters from the tasks and documents tables, for the
+    given applications or all of them. Used by set-based writes that bypass
+    the ORM and by `flask counters rebuild`. Only rows whose counters were
+    wrong are written, and their owners' data versions bumped so cached
+    pages pick up the fix; returns how many rows that was.
+    """
+    table = Application.__table__
+    actual = _actual_counts()
+    drifted = select(table.c.id).where(or_(*[table.c[column] != expression
+                                             for column, expression in actual.items()]))
+    if application_ids is not None:
+        if not application_ids:
+            return 0
+        drifted = drifted.where(table.c.id.in_(application_ids))
+    drifted = [ident for ident, in connection.execute(drifted)]
+    if not drifted:
+        return 0
+
+    for start in range(0, len(drifted), REPAIR_BATCH_SIZE):
+        batch = drifted[start:start + REPAIR_BATCH_SIZE]
+        connection.execute(update(table).where(table.c.id.in_(batch))
+                           .values(updated_at=table.c.updated_at, **actual))
+        bump_data_version(connection, application_ids=batch)
+    return len(drifted)
@@ -0,0 +1,77 @@
+import functools
+from flask import current_app, g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+
+class RoutingSession(Session):
+    """
+    Session that sends every statement to the read-only engine while a
+    @read_only view is running, and behaves normally otherwise. A write
+    attempted under @read_only fails instead of silently going through.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_app_context() and g.get('read_only'):
+            engine = current_app.extensions.get('read_engine')
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+def read_only(view):
+    """
+    Routes the view's queries, including the user loader's, to the read-only
+    pool. Apply directly under the route decorator.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        g.read_only = True
+        return view(*args, **kwargs)
+    return wrapper
+
+def _is_file_sqlite(url):
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:') \
+        and not url.database.startswith('file::memory:')
+
+def _pragma_listener(pragmas):
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name} = {value}')
+        finally:
+            cursor.close()
+    return set_pragmas
+
+def init_engines(app, db):
+    """
+    Applies SQLITE_PRAGMAS to the primary engine and, when READ_ONLY_SESSIONS
+    is on, creates the read-only engine: SQLALCHEMY_READ_DATABASE_URI if set,
+    else a second pool on the same SQLite file (WAL lets its readers run
+    alongside the writer). In-memory databases get no read engine, as a
+    second pool would see a different database.
+    """
+    pragmas = app.config.get('SQLITE_PRAGMAS') or {}
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name == 'sqlite' and pragmas:
+        event.listen(engine, 'connect', _pragma_listener(pragmas))
+
+    if not app.config.get('READ_ONLY_SESSIONS'):
+        return
+    read_uri = app.config.get('SQLALCHEMY_READ_DATABASE_URI')
+    if not read_uri:
+        if not _is_file_sqlite(engine.url):
+            return
+        read_uri = engine.url
+    read_url = make_url(read_uri)
+
+    read_engine = create_engine(read_url, **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    if read_engine.dialect.name == 'sqlite':
+        event.listen(read_engine, 'connect', _pragma_listener({**pragmas, 'query_only': 'ON'}))
+    app.extensions['read_engine'] = read_engine
+
+    @app.before_request
+    def reset_read_only():
+        # g outlives a request when an app context was already pushed
+        g.pop('read_only', None)
@@ -0,0 +1,69 @@
+from sqlalchemy.orm import selectinload
+from app.models import Application
+
+class ApplicationDetail:
+    """
+    An application together with its tasks, documents and their counts,
+    loaded up front so rendering never goes back to the database.
+    """
+
+    def __init__(self, application):
+        self.application = application
+        self.tasks = application.task_list
+        self.documents = application.document_list
+
+    @property
+    def task_count(self):
+        return len(self.tasks)
+
+    @property
+    def completed_task_count(self):
+        return sum(1 for task in self.tasks if task.is_completed)
+
+    @property
+    def document_count(self):
+        return len(self.documents)
+
+    def to_dict(self):
+        application = self.application
+        return {
+            'id': application.id,
+            'title': application.title,
+            'application_type': application.application_type,
+            'institution': application.institution,
+            'program_role': application.program_role,
+            'country': application.country,
+            'deadline': application.deadline.isoformat() if application.deadline else None,
+            'days_remaining': application.days_remaining(),
+            'status': application.status,
+            'application_url': application.application_url,
+            'notes': application.notes,
+            'created_at': application.created_at.isoformat() if application.created_at else None,
+            'updated_at': application.updated_at.isoformat() if application.updated_at else None,
+            'task_count': self.task_count,
+            'completed_task_count': self.completed_task_count,
+            'document_count': self.document_count,
+            'tasks': [{
+                'id': task.id,
+                'description': task.description,
+                'is_completed': bool(task.is_completed),
+                'created_at': task.created_at.isoformat() if task.created_at else None
+            } for task in self.tasks],
+            'documents': [{
+                'id': document.id,
+                'filename': document.filename,
+                'file_type': document.file_type,
+                'uploaded_at': document.uploaded_at.isoformat() if document.uploaded_at else None
+            } for document in self.documents]
+        }
+
+def load_application_detail(id):
+    """
+    Fetches an application with its tasks and documents in three queries
+    (the row itself plus one selectin load per collection), or 404s.
+    """
+    application = Application.query \
+        .options(selectinload(Application.task_list), selectinload(Application.document_list)) \
+        .filter_by(id=id) \
+        .first_or_404()
+    return ApplicationDetail(application)
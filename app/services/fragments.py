@@ -0,0 +1,202 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from flask import current_app, session
+from flask_login import current_user
+from markupsafe import Markup
+from app.services.metrics import FRAGMENT_CACHE
+from app.services.versions import current_data_version, csrf_epoch, release_id
+
+logger = logging.getLogger(__name__)
+
+class MemoryBackend:
+    """
+    Bounded in-process LRU. Each worker process has its own copy.
+    """
+
+    def __init__(self, max_entries=1000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+class SQLiteBackend:
+    """
+    Cache table in a standalone SQLite file, shared by every worker on the
+    host. Errors are logged and treated as misses; the cache is never
+    allowed to fail a page.
+    """
+
+    PRUNE_EVERY = 200
+
+    def __init__(self, path, max_entries=10000):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute('CREATE TABLE IF NOT EXISTS fragment '
+                               '(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)')
+            self._local.connection = connection
+        return connection
+
+    def get(self, key):
+        try:
+            row = self._connection().execute(
+                'SELECT value FROM fragment WHERE key = ? AND expires_at > ?', (key, time.time())
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("Fragment cache read failed: %s", e)
+            return None
+        return row[0] if row else None
+
+    def set(self, key, value, ttl):
+        try:
+            connection = self._connection()
+            connection.execute('INSERT OR REPLACE INTO fragment (key, value, expires_at) VALUES (?, ?, ?)',
+                               (key, value, time.time() + ttl))
+            self._writes += 1
+            if self._writes % self.PRUNE_EVERY == 0:
+                self._prune(connection)
+        except sqlite3.Error as e:
+            logger.warning("Fragment cache write failed: %s", e)
+
+    def _prune(self, connection):
+        connection.execute('DELETE FROM fragment WHERE expires_at <= ?', (time.time(),))
+        connection.execute(
+            'DELETE FROM fragment WHERE key IN (SELECT key FROM fragment ORDER BY expires_at DESC LIMIT -1 OFFSET ?)',
+            (self.max_entries,)
+        )
+
+    def delete(self, key):
+        try:
+            self._connection().execute('DELETE FROM fragment WHERE key = ?', (key,))
+        except sqlite3.Error as e:
+            logger.warning("Fragment cache write failed: %s", e)
+
+    def clear(self):
+        self._connection().execute('DELETE FROM fragment')
+
+class NullBackend:
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl):
+        pass
+
+    def delete(self, key):
+        pass
+
+    def clear(self):
+        pass
+
+class FragmentCache:
+    """
+    Caches rendered template fragments under keys that include the user's
+    data version, so any write to their data (see app.services.versions)
+    makes every older entry unreachable; stale entries then age out.
+    """
+
+    def __init__(self, backend, ttl=3600):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def fragment_key(self, name, parts):
+        # CSRF tokens rendered into a fragment are tied to the session and
+        # expire, so both are part of the key
+        csrf = session.get('csrf_token', '')
+        raw = '|'.join([
+            release_id(),
+            str(current_user.id),
+            str(current_data_version()),
+            date.today().isoformat(),
+            hashlib.sha1(csrf.encode()).hexdigest() if csrf else '',
+            str(csrf_epoch()),
+            name,
+        ] + [str(part) for part in parts])
+        return f'{name}:{hashlib.sha1(raw.encode()).hexdigest()}'
+
+    def render(self, name, parts, render):
+        key = self.fragment_key(name, parts)
+        html = self.backend.get(key)
+        if html is not None:
+            self.hits += 1
+            FRAGMENT_CACHE.inc(fragment=name, result='hit')
+            return Markup(html)
+
+        self.misses += 1
+        FRAGMENT_CACHE.inc(fragment=name, result='miss')
+        html = str(render())
+        self.backend.set(key, html, self.ttl)
+        return Markup(html)
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses}
+
+def create_backend(config, instance_path):
+    kind = config.get('FRAGMENT_CACHE_BACKEND', 'memory')
+    if kind == 'memory':
+        return MemoryBackend(config.get('FRAGMENT_CACHE_MAX_ENTRIES', 1000))
+    if kind == 'sqlite':
+        path = config.get('FRAGMENT_CACHE_PATH') or os.path.join(instance_path, 'fragment_cache.db')
+        return SQLiteBackend(path, config.get('FRAGMENT_CACHE_MAX_ENTRIES', 1000))
+    if kind == 'null':
+        return NullBackend()
+    raise ValueError(f'Unknown FRAGMENT_CACHE_BACKEND: {kind}')
+
+def cache_fragment(name, *parts, caller):
+    """
+    Jinja call block that renders its body once per key:
+
+        {% call cache_fragment('status_breakdown') %}...{% endcall %}
+
+    Extra arguments are added to the key; the block may only depend on them
+    and on the current user's data.
+    """
+    cache = current_app.extensions['fragment_cache']
+    return cache.render(name, parts, caller)
+
+def init_fragment_cache(app):
+    app.extensions['fragment_cache'] = FragmentCache(create_backend(app.config, app.instance_path),
+                                                     ttl=app.config.get('FRAGMENT_CACHE_TTL', 3600))
+    app.jinja_env.globals['cache_fragment'] = cache_fragment
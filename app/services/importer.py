@@ -0,0 +1,208 @@
+import csv
+import gzip
+import io
+import json
+from collections import namedtuple
+from datetime import date, datetime
+from urllib.parse import urlparse
+from flask import current_app
+from sqlalchemy import func
+from app import db
+from app.models import Application, User
+from app.services.search import search_index_available, refresh_user_search_index
+from app.services.versions import bump_data_version
+from app.services.reminders import schedule_for, plan_reminder
+
+# Export column -> Application attribute. Columns the export derives
+# (Days Remaining, Created, Updated) are accepted but ignored on import.
+IMPORT_FIELDS = {
+    'Title': 'title',
+    'Type': 'application_type',
+    'Institution': 'institution',
+    'Program/Role': 'program_role',
+    'Country': 'country',
+    'Deadline': 'deadline',
+    'Status': 'status',
+    'Application URL': 'application_url',
+    'Notes': 'notes',
+}
+
+IMPORT_FORMATS = ('csv', 'jsonl', 'json')
+
+# Stands in for a JSON Lines record that could not be parsed, so one bad
+# line is reported against its row instead of ending the import
+MalformedRecord = namedtuple('MalformedRecord', 'error')
+
+class ImportReport:
+    """
+    Outcome of an import: how many rows went in and why the others did not.
+    Only the first `max_errors` rejected rows are kept in detail.
+    """
+
+    def __init__(self, max_errors=1000):
+        self.imported = 0
+        self.rejected = 0
+        self.errors = []
+        self.max_errors = max_errors
+
+    def reject(self, row_number, messages):
+        self.rejected += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'row': row_number, 'errors': messages})
+
+    def to_dict(self):
+        return {
+            'imported': self.imported,
+            'rejected': self.rejected,
+            'errors': self.errors,
+            'errors_truncated': self.rejected > len(self.errors)
+        }
+
+def detect_format(filename):
+    """
+    Returns (format, gzipped) from an upload's filename, e.g. 'x.csv.gz'.
+    """
+    name = (filename or '').lower()
+    gzipped = name.endswith('.gz')
+    if gzipped:
+        name = name[:-3]
+    extension = name.rsplit('.', 1)[-1] if '.' in name else ''
+    return (extension if extension in IMPORT_FORMATS else None), gzipped
+
+def iter_records(stream, fmt, gzipped=False):
+    """
+    Yields one dict per input record without reading the whole file, except
+    for plain JSON arrays, which have to be parsed in one go. A JSON Lines
+    line that is not valid JSON yields a MalformedRecord.
+    """
+    if gzipped:
+        stream = gzip.GzipFile(fileobj=stream)
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+
+    if fmt == 'csv':
+        yield from csv.DictReader(text)
+    elif fmt == 'jsonl':
+        for line in text:
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield MalformedRecord(f'Invalid JSON: {e.msg} (column {e.colno})')
+    else:
+        records = json.load(text)
+        if not isinstance(records, list):
+            raise ValueError('JSON import must be an array of objects')
+        yield from records
+
+def validate_record(record, config):
+    """
+    Applies the ApplicationForm rules to one record.
+    Returns (values, errors); values is None when errors is non-empty.
+    """
+    if isinstance(record, MalformedRecord):
+        return None, [record.error]
+    if not isinstance(record, dict):
+        return None, ['Record must be an object']
+
+    raw = {attr: str(record.get(column) or '').strip() for column, attr in IMPORT_FIELDS.items()}
+    errors = []
+
+    for attr, label in (('title', 'Title'), ('institution', 'Institution')):
+        if not raw[attr]:
+            errors.append(f'{label} is required')
+    for attr, label in (('title', 'Title'), ('institution', 'Institution'), ('program_role', 'Program/Role')):
+        if len(raw[attr]) > 200:
+            errors.append(f'{label} must be at most 200 characters')
+
+    if raw['application_type'] not in config['APPLICATION_TYPES']:
+        errors.append(f"Type must be one of: {', '.join(config['APPLICATION_TYPES'])}")
+    if raw['country'] and raw['country'] not in config['COUNTRIES']:
+        errors.append(f"Country must be one of: {', '.join(config['COUNTRIES'])}")
+
+    status = raw['status'] or 'Not Started'
+    if status not in config['STATUS_CHOICES']:
+        errors.append(f"Status must be one of: {', '.join(config['STATUS_CHOICES'])}")
+
+    # fromisoformat is much cheaper than strptime; the length check keeps it
+    # to the YYYY-MM-DD form the DateField accepts
+    deadline = None
+    try:
+        if len(raw['deadline']) != 10:
+            raise ValueError
+        deadline = date.fromisoformat(raw['deadline'])
+    except ValueError:
+        errors.append('Deadline must be a date in YYYY-MM-DD format')
+
+    url = raw['application_url']
+    if url:
+        parsed = urlparse(url)
+        if parsed.scheme not in ('http', 'https') or not parsed.netloc or len(url) > 500:
+            errors.append('Application URL must be a valid http(s) URL')
+
+    if errors:
+        return None, errors
+
+    return {
+        'title': raw['title'],
+        'application_type': raw['application_type'],
+        'institution': raw['institution'],
+        'program_role': raw['program_role'] or None,
+        'country': raw['country'] or None,
+        'deadline': deadline,
+        'status': status,
+        'application_url': url or None,
+        'notes': raw['notes'] or None,
+    }, []
+
+def _insert_batch(user_id, rows):
+    # Plain Core executemany, without ORM bookkeeping or RETURNING per row
+    table = Application.__table__
+    previous_max = db.session.query(func.max(Application.id)).scalar() or 0
+    db.session.execute(table.insert(), rows)
+
+    # Everything this user has above the old high-water mark is at least this
+    # batch; re-indexing a concurrent insert as well is harmless
+    connection = db.session.connection()
+    if search_index_available(connection):
+        refresh_user_search_index(connection, user_id, previous_max)
+    bump_data_version(connection, [user_id])
+    db.session.commit()
+
+def import_applications(user_id, stream, fmt, gzipped=False):
+    """
+    Streams records from `stream`, validates each one and inserts the valid
+    ones in IMPORT_BATCH_SIZE executemany batches, committing per batch so
+    the write lock is never held for the whole file. Row numbers in the
+    report are 1-based data rows (a CSV header is not counted).
+    """
+    config = current_app.config
+    batch_size = config['IMPORT_BATCH_SIZE']
+    report = ImportReport(config['IMPORT_MAX_ERRORS'])
+    batch = []
+    # Core inserts skip the ORM hook that schedules reminders
+    schedule = schedule_for(db.session.get(User, user_id))
+    now = datetime.utcnow()
+
+    try:
+        for row_number, record in enumerate(iter_records(stream, fmt, gzipped), 1):
+            values, errors = validate_record(record, config)
+            if errors:
+                report.reject(row_number, errors)
+                continue
+            values['user_id'] = user_id
+            values['next_reminder_at'], values['next_reminder_days'] = plan_reminder(
+                values['deadline'], values['status'], schedule, set(), now)
+            batch.append(values)
+            if len(batch) >= batch_size:
+                _insert_batch(user_id, batch)
+                report.imported += len(batch)
+                batch = []
+    except (ValueError, UnicodeDecodeError, OSError, csv.Error) as e:
+        # A malformed file stops the import; rows already committed stay
+        report.reject(None, [f'Could not read file: {e}'])
+
+    if batch:
+        _insert_batch(user_id, batch)
+        report.imported += len(batch)
+
+    return report
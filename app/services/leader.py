@@ -0,0 +1,174 @@
+import functools
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import or_, select, update, delete
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models import SchedulerLease, JobRun
+
+logger = logging.getLogger(__name__)
+
+LEASE_NAME = 'scheduler'
+
+_holder = None
+_holder_pid = None
+
+def holder_id():
+    """
+    Identifies this process in the lease table. Recomputed after a fork so
+    gunicorn workers forked from a preloaded master do not share an id.
+    """
+    global _holder, _holder_pid
+    if _holder_pid != os.getpid():
+        _holder = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        _holder_pid = os.getpid()
+    return _holder
+
+def try_acquire(ttl, holder=None, now=None):
+    """
+    Takes or renews the scheduler lease. Succeeds when this process already
+    holds it or the previous holder let it expire, i.e. died or hung.
+    Returns True while this process is the leader.
+    """
+    holder = holder or holder_id()
+    now = now or datetime.utcnow()
+    lease = SchedulerLease.__table__
+    with db.engine.begin() as connection:
+        current = connection.execute(select(lease.c.holder).where(lease.c.name == LEASE_NAME)).scalar()
+        if current is None:
+            try:
+                with connection.begin_nested():
+                    connection.execute(lease.insert().values(
+                        name=LEASE_NAME, holder=holder, acquired_at=now, expires_at=now + ttl))
+            except IntegrityError:
+                # Another process inserted the row first
+                return False
+        else:
+            values = {'holder': holder, 'expires_at': now + ttl}
+            if current != holder:
+                values['acquired_at'] = now
+            result = connection.execute(
+                update(lease)
+                .where(lease.c.name == LEASE_NAME,
+                       or_(lease.c.holder == holder, lease.c.expires_at < now))
+                .values(**values)
+            )
+            if result.rowcount == 0:
+                return False
+
+        if current != holder:
+            logger.info("Scheduler lease acquired by %s", holder)
+            # Runs the old leader never finished will not finish now
+            connection.execute(
+                update(JobRun.__table__)
+                .where(JobRun.outcome == 'running', JobRun.holder != holder)
+                .values(outcome='abandoned')
+            )
+    return True
+
+def holds_lease(holder=None, now=None):
+    lease = SchedulerLease.__table__
+    with db.engine.connect() as connection:
+        return connection.execute(
+            select(lease.c.name).where(lease.c.name == LEASE_NAME,
+                                       lease.c.holder == (holder or holder_id()),
+                                       lease.c.expires_at >= (now or datetime.utcnow()))
+        ).first() is not None
+
+def release(holder=None):
+    """
+    Gives the lease up at shutdown so another worker can take over at its
+    next heartbeat instead of waiting for the lease to expire.
+    """
+    lease = SchedulerLease.__table__
+    with db.engine.begin() as connection:
+        connection.execute(
+            update(lease)
+            .where(lease.c.name == LEASE_NAME, lease.c.holder == (holder or holder_id()))
+            .values(expires_at=datetime.utcnow() - timedelta(seconds=1))
+        )
+
+def last_success(job_id):
+    return db.session.query(db.func.max(JobRun.started_at)) \
+        .filter(JobRun.job_id == job_id, JobRun.outcome == 'success').scalar()
+
+def _record(values, run_id=None):
+    table = JobRun.__table__
+    with db.engine.begin() as connection:
+        if run_id is None:
+            return connection.execute(table.insert().values(**values)).inserted_primary_key[0]
+        connection.execute(update(table).where(table.c.id == run_id).values(**values))
+
+def leader_job(app, job_id, every=None):
+    """
+    Wraps a scheduled job so it only runs in the lease holder, and at most
+    once per `every` (a timedelta) across all processes and restarts, going
+    by the job_run history. Exceptions are logged, recorded and re-raised.
+
+    Jobs with `every` are recorded as running when they start and updated
+    when they finish. Frequent jobs (no `every`) write a single row once
+    they finish, and only if they failed or did something, i.e. returned
+    a truthy value; an idle tick costs no write at all.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with app.app_context():
+                if not holds_lease():
+                    return None
+                started_at = datetime.utcnow()
+                run_id = None
+                if every is not None:
+                    previous = last_success(job_id)
+                    if previous is not None and started_at - previous < every:
+                        return None
+                    run_id = _record({'job_id': job_id, 'holder': holder_id(),
+                                      'started_at': started_at, 'outcome': 'running'})
+
+            start = time.perf_counter()
+            values = {'outcome': 'error'}
+            result = None
+            try:
+                result = func(*args, **kwargs)
+                values['outcome'] = 'success'
+                return result
+            except Exception as e:
+                values['error'] = repr(e)
+                logger.exception("Scheduled job %s failed", job_id)
+                raise
+            finally:
+                if run_id is not None or values['outcome'] == 'error' or result:
+                    values['finished_at'] = datetime.utcnow()
+                    values['duration'] = time.perf_counter() - start
+                    if run_id is None:
+                        values.update(job_id=job_id, holder=holder_id(), started_at=started_at)
+                    with app.app_context():
+                        _record(values, run_id)
+        return wrapper
+    return decorator
+
+def prune_history(app):
+    """
+    Deletes job_run rows older than JOB_RUN_RETENTION_DAYS, for every job.
+    Scheduled once a day; returns the number of rows removed.
+    """
+    with app.app_context():
+        cutoff = datetime.utcnow() - timedelta(days=app.config['JOB_RUN_RETENTION_DAYS'])
+        table = JobRun.__table__
+        with db.engine.begin() as connection:
+            return connection.execute(delete(table).where(table.c.started_at < cutoff)).rowcount
+
+def heartbeat(app):
+    """
+    Runs in every process on a short interval: the leader renews its lease,
+    the others take over once it has lapsed.
+    """
+    with app.app_context():
+        try:
+            try_acquire(timedelta(seconds=app.config['SCHEDULER_LEASE_TTL']))
+        except Exception:
+            logger.exception("Scheduler lease heartbeat failed")
@@ -0,0 +1,189 @@
+import logging
+import smtplib
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from sqlalchemy import or_, and_
+from app import db
+from app.models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+def enqueue_email(recipient, subject, body):
+    """
+    Queues an email in the outbox. Nothing is sent and nothing is committed
+    here: the row becomes visible to the delivery workers when the caller
+    commits, so it is written atomically with whatever triggered it.
+    """
+    email = OutboxEmail(recipient=recipient, subject=subject, body=body)
+    db.session.add(email)
+    return email
+
+class ConsoleTransport:
+    """
+    Development transport that prints messages instead of sending them.
+    """
+
+    def __init__(self, config):
+        self.config = config
+
+    def send(self, email):
+        print("\n" + "="*50)
+        print(f"📧 EMAIL SIMULATION TO: {email.recipient}")
+        print(f"SUBJECT: {email.subject}")
+        print("-" * 50)
+        print(email.body)
+        print("="*50 + "\n")
+
+    def close(self):
+        pass
+
+class SMTPTransport:
+    """
+    Sends over one SMTP connection that is opened lazily and reused for every
+    message in a batch, reconnecting once if the server drops it.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.connection = None
+
+    def _connect(self):
+        config = self.config
+        connection = smtplib.SMTP(config['MAIL_SERVER'], config['MAIL_PORT'],
+                                  timeout=config['MAIL_TIMEOUT'])
+        if config['MAIL_USE_TLS']:
+            connection.starttls()
+        if config['MAIL_USERNAME']:
+            connection.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
+        return connection
+
+    def send(self, email):
+        message = EmailMessage()
+        message['From'] = self.config['MAIL_DEFAULT_SENDER']
+        message['To'] = email.recipient
+        message['Subject'] = email.subject
+        message.set_content(email.body)
+
+        if self.connection is None:
+            self.connection = self._connect()
+        try:
+            self.connection.send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            self.connection = self._connect()
+            self.connection.send_message(message)
+
+    def close(self):
+        if self.connection is not None:
+            try:
+                self.connection.quit()
+            except smtplib.SMTPException:
+                pass
+            self.connection = None
+
+TRANSPORTS = {
+    'console': ConsoleTransport,
+    'smtp': SMTPTransport,
+}
+
+def claim_batch(config, now=None):
+    """
+    Atomically marks up to MAIL_BATCH_SIZE due emails as `sending` under a
+    fresh claim token and returns them. Rows stuck in `sending` longer than
+    MAIL_CLAIM_TIMEOUT (a worker died mid-batch) are eligible again.
+    """
+    now = now or datetime.utcnow()
+    token = uuid.uuid4().hex
+    stale = now - timedelta(seconds=config['MAIL_CLAIM_TIMEOUT'])
+
+    due = db.session.query(OutboxEmail.id).filter(or_(
+        and_(OutboxEmail.status == 'pending', OutboxEmail.next_attempt_at <= now),
+        and_(OutboxEmail.status == 'sending', OutboxEmail.claimed_at < stale)
+    )).order_by(OutboxEmail.next_attempt_at, OutboxEmail.id).limit(config['MAIL_BATCH_SIZE'])
+
+    OutboxEmail.query.filter(OutboxEmail.id.in_(due.scalar_subquery())) \
+        .update({'status': 'sending', 'claim_token': token, 'claimed_at': now},
+                synchronize_session=False)
+    db.session.commit()
+
+    return OutboxEmail.query.filter_by(claim_token=token, status='sending') \
+        .order_by(OutboxEmail.id).all()
+
+def record_failure(email, error, config, now=None):
+    """
+    Column values recording a failed attempt: back to `pending` with
+    exponential backoff, or `dead` once MAIL_MAX_ATTEMPTS is reached.
+    """
+    now = now or datetime.utcnow()
+    attempts = email.attempts + 1
+    values = {'attempts': attempts, 'last_error': str(error)[:1000], 'claim_token': None}
+    if attempts >= config['MAIL_MAX_ATTEMPTS']:
+        values['status'] = 'dead'
+        logger.error("Email %s dead-lettered after %d attempts: %s", email.id, attempts, error)
+    else:
+        # Exponential backoff: base, 2*base, 4*base, ...
+        delay = config['MAIL_RETRY_BASE_SECONDS'] * 2 ** (attempts - 1)
+        values['status'] = 'pending'
+        values['next_attempt_at'] = now + timedelta(seconds=delay)
+    return values
+
+def record_delivery(email_id, token, values):
+    """
+    Writes one email's outcome and commits it straight away, but only while
+    this worker's claim still holds: a row that timed out and was claimed
+    by another worker is left to that worker. Returns whether it was written.
+    """
+    written = OutboxEmail.query.filter_by(id=email_id, claim_token=token) \
+        .update(values, synchronize_session=False)
+    db.session.commit()
+    if not written:
+        logger.warning("Email %s was reclaimed by another worker before its outcome was recorded", email_id)
+    return bool(written)
+
+def drain_outbox(app):
+    """
+    Worker loop: claims and delivers batches over a single transport until
+    the outbox has nothing due. Each outcome is committed as soon as the
+    message is sent, so a crash mid-batch resends at most one email.
+    Returns the number of emails sent.
+    """
+    sent = 0
+    with app.app_context():
+        config = app.config
+        transport = TRANSPORTS[config['MAIL_BACKEND']](config)
+        try:
+            while True:
+                batch = claim_batch(config)
+                if not batch:
+                    break
+                token = batch[0].claim_token
+                for email in batch:
+                    # Reloaded after the previous commit; skip rows claimed away since
+                    if email.claim_token != token:
+                        continue
+                    try:
+                        transport.send(email)
+                    except Exception as e:
+                        record_delivery(email.id, token, record_failure(email, e, config))
+                        # Start the next message on a fresh connection
+                        transport.close()
+                    else:
+                        sent += record_delivery(email.id, token, {'status': 'sent', 'sent_at': datetime.utcnow(),
+                                                                  'claim_token': None})
+        finally:
+            transport.close()
+    return sent
+
+def deliver_outbox(app):
+    """
+    Drains the outbox with MAIL_WORKERS parallel workers, each holding its
+    own SMTP connection and database session. Returns the number sent.
+    """
+    workers = app.config['MAIL_WORKERS']
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='outbox') as pool:
+        results = [pool.submit(drain_outbox, app) for _ in range(workers)]
+    sent = sum(future.result() for future in results)
+    if sent:
+        logger.info("Delivered %d queued email(s)", sent)
+    return sent
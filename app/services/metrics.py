@@ -0,0 +1,211 @@
+import functools
+import hmac
+import threading
+import time
+from flask import g, request, has_request_context, before_render_template, template_rendered, abort
+from sqlalchemy import event
+from app import db
+
+# Default latency buckets in seconds, roughly Prometheus client defaults
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"' for k, v in pairs)
+    return '{' + ','.join(escaped) + '}'
+
+def _format_value(value):
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class Counter:
+    """
+    Monotonic counter with optional labels. Updates take one lock, so they
+    are safe from request threads and scheduler threads alike.
+    """
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, '') for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f'{self.name}_total{_format_labels(self.labelnames, key)} {_format_value(value)}'
+
+class Histogram:
+    """
+    Cumulative-bucket histogram in the Prometheus exposition format.
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, '') for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0, 0.0]
+            counts = series[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            series[1] += 1
+            series[2] += value
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, (list(s[0]), s[1], s[2])) for key, s in self._series.items())
+        for key, (counts, count, total) in items:
+            for bound, bucket_count in zip(self.buckets, counts):
+                labels = _format_labels(self.labelnames, key, [('le', _format_value(bound))])
+                yield f'{self.name}_bucket{labels} {bucket_count}'
+            labels = _format_labels(self.labelnames, key, [('le', '+Inf')])
+            yield f'{self.name}_bucket{labels} {count}'
+            yield f'{self.name}_count{_format_labels(self.labelnames, key)} {count}'
+            yield f'{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}'
+
+REQUEST_LATENCY = Histogram('apptrack_request_duration_seconds',
+                            'HTTP request latency by endpoint',
+                            ('blueprint', 'endpoint', 'method', 'status'))
+REQUEST_QUERIES = Histogram('apptrack_request_db_queries',
+                            'SQL statements executed per request',
+                            ('blueprint', 'endpoint'), buckets=COUNT_BUCKETS)
+REQUEST_DB_TIME = Histogram('apptrack_request_db_duration_seconds',
+                            'Time spent in SQL statements per request',
+                            ('blueprint', 'endpoint'))
+DB_QUERIES = Counter('apptrack_db_queries', 'SQL statements executed', ('context',))
+TEMPLATE_RENDER = Histogram('apptrack_template_render_seconds',
+                            'Jinja template render time', ('template',))
+JOB_DURATION = Histogram('apptrack_job_duration_seconds',
+                         'Scheduled job run time', ('job', 'outcome'),
+                         buckets=DEFAULT_BUCKETS + (30.0, 60.0, 300.0))
+JOB_RUNS = Counter('apptrack_job_runs', 'Scheduled job runs by outcome', ('job', 'outcome'))
+FRAGMENT_CACHE = Counter('apptrack_fragment_cache_requests', 'Template fragment cache lookups',
+                         ('fragment', 'result'))
+
+REGISTRY = [REQUEST_LATENCY, REQUEST_QUERIES, REQUEST_DB_TIME, DB_QUERIES,
+            TEMPLATE_RENDER, JOB_DURATION, JOB_RUNS, FRAGMENT_CACHE]
+
+def render_metrics(registry=REGISTRY):
+    lines = []
+    for metric in registry:
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        lines.extend(metric.samples())
+    return '\n'.join(lines) + '\n'
+
+def timed_job(job_id):
+    """
+    Decorator recording duration and outcome ('success' or 'error') of a
+    scheduled job. Exceptions are re-raised for the scheduler to log.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            outcome = 'error'
+            try:
+                result = func(*args, **kwargs)
+                outcome = 'success'
+                return result
+            finally:
+                JOB_DURATION.observe(time.perf_counter() - start, job=job_id, outcome=outcome)
+                JOB_RUNS.inc(job=job_id, outcome=outcome)
+        return wrapper
+    return decorator
+
+def _labels():
+    endpoint = request.endpoint or 'unmatched'
+    return {'blueprint': request.blueprint or '', 'endpoint': endpoint}
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the statement's execution context, which is discarded with the
+    # statement, so one that raises leaves nothing behind on the connection
+    if context is not None:
+        context._metrics_start = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, '_metrics_start', None)
+    elapsed = time.perf_counter() - start if start is not None else 0.0
+    if has_request_context() and 'metrics_start' in g:
+        g.metrics_queries += 1
+        g.metrics_db_time += elapsed
+        DB_QUERIES.inc(context='request')
+    else:
+        DB_QUERIES.inc(context='background')
+
+def _before_render(sender, template, context, **extra):
+    if has_request_context():
+        g.setdefault('metrics_render_start', []).append(time.perf_counter())
+
+def _after_render(sender, template, context, **extra):
+    if has_request_context() and g.get('metrics_render_start'):
+        elapsed = time.perf_counter() - g.metrics_render_start.pop()
+        TEMPLATE_RENDER.observe(elapsed, template=template.name or 'string')
+
+def init_metrics(app):
+    """
+    Instruments `app` and exposes GET /metrics when METRICS_ENABLED is set.
+    Metrics are per process; scrape each worker or aggregate upstream.
+    """
+    if not app.config.get('METRICS_ENABLED'):
+        return
+
+    @app.before_request
+    def start_request_timer():
+        g.metrics_start = time.perf_counter()
+        g.metrics_queries = 0
+        g.metrics_db_time = 0.0
+
+    @app.after_request
+    def record_request(response):
+        if 'metrics_start' in g and request.endpoint != 'metrics':
+            labels = _labels()
+            REQUEST_LATENCY.observe(time.perf_counter() - g.metrics_start,
+                                    method=request.method, status=str(response.status_code), **labels)
+            REQUEST_QUERIES.observe(g.metrics_queries, **labels)
+            REQUEST_DB_TIME.observe(g.metrics_db_time, **labels)
+        return response
+
+    with app.app_context():
+        engines = [db.engine]
+    if 'read_engine' in app.extensions:
+        engines.append(app.extensions['read_engine'])
+    for engine in engines:
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_after_render, app)
+
+    @app.route('/metrics')
+    def metrics():
+        token = app.config.get('METRICS_TOKEN')
+        if token:
+            supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+            # Compared as bytes: compare_digest rejects non-ASCII str
+            if not hmac.compare_digest(supplied.encode(), token.encode()):
+                abort(401)
+        return render_metrics(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
@@ -1,8 +1,12 @@
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
+from itertools import groupby
 from flask import current_app
 from app import db
-from app.models import Application, User, Task
+from app.models import Application, User, Task, ReminderLog
+from app.services.mailer import enqueue_email
+from app.services.reminders import (schedule_for, local_today, plan_reminder,
+                                    sent_offsets, save_next_reminders)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -10,56 +14,135 @@ logger = logging.getLogger(__name__)
 
 def send_email_reminder(user, subject, body):
     """
-    Mock email sender for development.
-    In production, this would use Flask-Mail or an external service.
+    Queues a reminder in the email outbox. Delivery happens asynchronously
+    in the outbox workers (see app.services.mailer), so the scheduler tick
+    never blocks on SMTP. Callers commit the session to release the email.
     """
-    # Simulate sending email by logging to console
-    print("\n" + "="*50)
-    print(f"📧 EMAIL SIMULATION TO: {user.email}")
-    print(f"SUBJECT: {subject}")
-    print("-" * 50)
-    print(body)
-    print("="*50 + "\n")
-    
-    # In a real app, you would do:
-    # msg = Message(subject, recipients=[user.email], body=body)
-    # mail.send(msg)
+    enqueue_email(user.email, subject, body)
 
-def check_upcoming_deadlines(app):
+def find_due_users(now, after_user_id, limit):
     """
-    Checks for applications with deadlines in 7 days, 3 days, and 1 day.
+    Up to `limit` ids of users with a due reminder, in id order after
+    `after_user_id`, so batches always hold whole users.
     """
-    with app.app_context():
-        logger.info("Checking for upcoming deadlines...")
-        today = datetime.utcnow().date()
-        
-        # Deadlines to check: 7 days, 3 days, 1 day
-        intervals = [7, 3, 1]
-        
-        for days in intervals:
-            target_date = today + timedelta(days=days)
-            
-            # Find applications due on this target date
-            applications = Application.query.filter(
-                Application.deadline == target_date,
-                Application.status.notin_(['Submitted', 'Accepted', 'Rejected', 'Waitlisted'])
-            ).all()
-            
-            for application in applications:
-                user = User.query.get(application.user_id)
-                subject = f"Reminder: {application.title} due in {days} day{'s' if days > 1 else ''}!"
-                body = f"""Hello {user.username},
-                
-This is a reminder that your application for '{application.title}' at {application.institution} is due in {days} days on {application.deadline.strftime('%B %d, %Y')}.
+    return [user_id for user_id, in db.session.query(Application.user_id)
+            .filter(Application.next_reminder_at <= now, Application.user_id > after_user_id)
+            .distinct()
+            .order_by(Application.user_id)
+            .limit(limit)]
+
+def find_due_reminders(now, user_ids):
+    """
+    Returns every (application, user) pair of `user_ids` whose
+    next_reminder_at has passed, ordered by user.
+    """
+    if not user_ids:
+        return []
+    return db.session.query(Application, User) \
+        .join(User, Application.user_id == User.id) \
+        .filter(Application.next_reminder_at <= now, Application.user_id.in_(user_ids)) \
+        .order_by(Application.user_id, Application.deadline, Application.id) \
+        .all()
+
+def build_digest(user, reminders):
+    """
+    Formats one email covering all of a user's due reminders.
+    `reminders` is a list of (application, days) pairs.
+    """
+    if len(reminders) == 1:
+        application, days = reminders[0]
+        subject = f"Reminder: {application.title} due in {days} day{'s' if days != 1 else ''}!"
+    else:
+        subject = f"Reminder: {len(reminders)} application deadlines coming up"
+    
+    lines = []
+    for application, days in reminders:
+        lines.append(f"- '{application.title}' at {application.institution}: due in {days} "
+                     f"day{'s' if days != 1 else ''} on {application.deadline.strftime('%B %d, %Y')} "
+                     f"(Current Status: {application.status})")
+    
+    body = f"""Hello {user.username},
 
-Current Status: {application.status}
+This is a reminder about your upcoming application deadlines:
+
+{chr(10).join(lines)}
 
 Don't forget to review your materials and submit on time!
 
 Good luck,
 AppTrack Pro Bot
 """
-                send_email_reminder(user, subject, body)
+    return subject, body
+
+def check_upcoming_deadlines(app, now=None):
+    """
+    Sends one digest per user for applications whose next_reminder_at has
+    passed, then schedules each one's following reminder. Each sent reminder
+    is written to the ReminderLog ledger in the same transaction, so a
+    re-run skips work already done. Meant to run every few minutes; a tick
+    with nothing due is a single indexed query. Returns the number of
+    digests sent.
+    """
+    with app.app_context():
+        logger.info("Checking for upcoming deadlines...")
+        now = now or datetime.utcnow()
+        batch_size = app.config['REMINDER_BATCH_SIZE']
+        
+        sent = 0
+        last_user_id = 0
+        while True:
+            # Batches hold whole users, so nobody gets two digests in a run;
+            # the keyset also moves past users whose digest failed, who keep
+            # their due rows until the next run
+            user_ids = find_due_users(now, last_user_id, batch_size)
+            if not user_ids:
+                break
+            last_user_id = user_ids[-1]
+            rows = find_due_reminders(now, user_ids)
+            for user, group in groupby(rows, key=lambda row: row[1]):
+                applications = [application for application, _ in group]
+                if _send_user_reminders(user, applications, now):
+                    sent += 1
+        
+        logger.info("Sent %d deadline reminder digest(s)", sent)
+        return sent
+
+def _send_user_reminders(user, applications, now):
+    """
+    Sends one user's due reminders and reschedules the applications.
+    Returns True if a digest went out, False if nothing was due after all
+    (e.g. a catch-up window had passed) and None on failure.
+    """
+    schedule = schedule_for(user)
+    today = local_today(schedule, now)
+    ledger = sent_offsets([application.id for application in applications])
+    
+    reminders = []
+    plans = []
+    for application in applications:
+        offsets = {days for deadline, days in ledger.get(application.id, ())
+                   if deadline == application.deadline}
+        fire_at, days = plan_reminder(application.deadline, application.status, schedule, offsets, now)
+        if fire_at is not None and fire_at <= now:
+            reminders.append((application, (application.deadline - today).days))
+            db.session.add(ReminderLog(application_id=application.id,
+                                       deadline=application.deadline,
+                                       days_before=days))
+            offsets.add(days)
+            fire_at, days = plan_reminder(application.deadline, application.status, schedule, offsets, now)
+        plans.append((application.id, fire_at, days))
+    
+    try:
+        if reminders:
+            subject, body = build_digest(user, reminders)
+            send_email_reminder(user, subject, body)
+        save_next_reminders(plans)
+        db.session.commit()
+        return bool(reminders)
+    except Exception:
+        db.session.rollback()
+        logger.exception("Failed to send deadline reminder to user %s", user.id)
+        return None
 
 def check_overdue_tasks(app):
     """
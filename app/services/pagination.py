@@ -0,0 +1,112 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from sqlalchemy import tuple_
+from app.models import Application
+
+# Sort key -> (column, direction). The primary key is always appended as a
+# tie-breaker so that every ordering is total and cursors stay stable.
+SORT_COLUMNS = {
+    'deadline': (Application.deadline, 'asc'),
+    'created': (Application.created_at, 'desc'),
+    'status': (Application.status, 'asc'),
+    'title': (Application.title, 'asc'),
+}
+
+class KeysetPage:
+    """A single page of results plus the cursors needed to move around it."""
+
+    def __init__(self, items, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+def _serialize(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+def _deserialize(sort_by, value):
+    if sort_by == 'deadline':
+        return date.fromisoformat(value)
+    if sort_by == 'created':
+        return datetime.fromisoformat(value)
+    return value
+
+def encode_cursor(sort_by, application):
+    column, _ = SORT_COLUMNS[sort_by]
+    payload = [_serialize(getattr(application, column.key)), application.id]
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(sort_by, token):
+    """
+    Decodes a cursor produced by encode_cursor.
+    Returns None for anything malformed so callers can fall back to page one.
+    """
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        value, ident = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if value is None:
+            return None
+        return _deserialize(sort_by, value), int(ident)
+    except (binascii.Error, ValueError, TypeError, UnicodeDecodeError):
+        return None
+
+def paginate(query, sort_by, per_page, after=None, before=None):
+    """
+    Applies keyset pagination to an Application query.
+
+    `after` and `before` are opaque cursors; at most one is honoured. Rows are
+    located with a row-value comparison on (sort column, id), so the database
+    can seek straight into the matching (user_id, <column>) index and pages
+    do not shift when rows are inserted or deleted elsewhere in the list.
+    """
+    if sort_by not in SORT_COLUMNS:
+        sort_by = 'deadline'
+    column, direction = SORT_COLUMNS[sort_by]
+    key = tuple_(column, Application.id)
+
+    after_key = decode_cursor(sort_by, after)
+    before_key = decode_cursor(sort_by, before) if after_key is None else None
+
+    # Walking backwards means flipping both the comparison and the ordering,
+    # then restoring display order once the rows are loaded.
+    backwards = before_key is not None
+    ascending = (direction == 'asc') != backwards
+
+    if after_key is not None:
+        query = query.filter(key > after_key if direction == 'asc' else key < after_key)
+    elif backwards:
+        query = query.filter(key < before_key if direction == 'asc' else key > before_key)
+
+    if ascending:
+        query = query.order_by(column.asc(), Application.id.asc())
+    else:
+        query = query.order_by(column.desc(), Application.id.desc())
+
+    rows = query.limit(per_page + 1).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+
+    if backwards:
+        rows.reverse()
+        has_prev, has_next = has_more, True
+    else:
+        has_prev, has_next = after_key is not None, has_more
+
+    next_cursor = encode_cursor(sort_by, rows[-1]) if rows and has_next else None
+    prev_cursor = encode_cursor(sort_by, rows[0]) if rows and has_prev else None
+
+    return KeysetPage(rows, next_cursor=next_cursor, prev_cursor=prev_cursor)
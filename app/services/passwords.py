@@ -0,0 +1,77 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+
+class PasswordHashingBusy(Exception):
+    """
+    Raised when PASSWORD_HASH_MAX_PENDING hashes are already queued, so the
+    caller can shed load instead of tying up another request thread.
+    """
+
+_lock = threading.Lock()
+_pool = None
+_pool_pid = None
+_slots = None
+
+def _context():
+    # Never fork: the app process runs request and scheduler threads, and a
+    # child forked while one of them holds a lock would deadlock on it.
+    # forkserver children are forked from a clean single-threaded server.
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload(['werkzeug.security'])
+        return context
+    return multiprocessing.get_context('spawn')
+
+def _executor(config):
+    """
+    The process-wide hashing pool, created on first use and again after a
+    fork, since a pool cannot be shared with a child process.
+    """
+    global _pool, _pool_pid, _slots
+    with _lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ProcessPoolExecutor(max_workers=config['PASSWORD_HASH_WORKERS'], mp_context=_context())
+            _pool_pid = os.getpid()
+            _slots = threading.BoundedSemaphore(config['PASSWORD_HASH_MAX_PENDING'])
+        return _pool, _slots
+
+def _run(func, *args):
+    config = current_app.config
+    if not config.get('PASSWORD_HASH_WORKERS'):
+        return func(*args)
+
+    pool, slots = _executor(config)
+    if not slots.acquire(blocking=False):
+        raise PasswordHashingBusy()
+    try:
+        future = pool.submit(func, *args)
+    except BaseException:
+        slots.release()
+        raise
+    future.add_done_callback(lambda _: slots.release())
+    try:
+        return future.result(timeout=config['PASSWORD_HASH_TIMEOUT'])
+    except TimeoutError:
+        raise PasswordHashingBusy()
+
+def hash_password(password):
+    config = current_app.config
+    return _run(generate_password_hash, password,
+                config['PASSWORD_HASH_METHOD'], config['PASSWORD_SALT_LENGTH'])
+
+def verify_password(password_hash, password):
+    if not password_hash:
+        return False
+    return _run(check_password_hash, password_hash, password)
+
+def needs_rehash(password_hash):
+    """
+    True when a stored hash was made with parameters other than the
+    configured PASSWORD_HASH_METHOD (e.g. 'scrypt:32768:8:1').
+    """
+    method = password_hash.split('$', 1)[0] if password_hash else ''
+    return method != current_app.config['PASSWORD_HASH_METHOD']
@@ -0,0 +1,158 @@
+from collections import namedtuple
+from datetime import datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from flask import current_app
+from sqlalchemy import bindparam, event, inspect, update
+from app import db
+from app.models import Application, User, ReminderLog
+
+ReminderSchedule = namedtuple('ReminderSchedule', 'offsets tz hour')
+
+def parse_offsets(text):
+    """
+    Parses '7, 3, 1' into [7, 3, 1]. Raises ValueError for anything that is
+    not a list of whole days between 0 and 365.
+    """
+    offsets = sorted({int(part) for part in text.split(',') if part.strip()}, reverse=True)
+    if not offsets or any(offset < 0 or offset > 365 for offset in offsets):
+        raise ValueError('Reminder offsets must be whole days between 0 and 365')
+    return offsets
+
+def get_zone(name):
+    try:
+        return ZoneInfo(name or 'UTC')
+    except (ZoneInfoNotFoundError, ValueError):
+        return ZoneInfo('UTC')
+
+def schedule_for(user, config=None):
+    config = config or current_app.config
+    offsets = config['REMINDER_INTERVALS']
+    if user.reminder_offsets:
+        try:
+            offsets = parse_offsets(user.reminder_offsets)
+        except ValueError:
+            pass
+    hour = user.reminder_hour if user.reminder_hour is not None else config['REMINDER_SEND_HOUR']
+    return ReminderSchedule(offsets, get_zone(user.timezone), hour)
+
+def fire_time(deadline, offset, schedule):
+    """
+    UTC time (naive, like every other timestamp here) of the reminder sent
+    `offset` days before `deadline`, at the user's local reminder hour.
+    """
+    local = datetime.combine(deadline - timedelta(days=offset), time(schedule.hour), tzinfo=schedule.tz)
+    return local.astimezone(timezone.utc).replace(tzinfo=None)
+
+def local_today(schedule, now):
+    return now.replace(tzinfo=timezone.utc).astimezone(schedule.tz).date()
+
+def plan_reminder(deadline, status, schedule, sent, now, config=None):
+    """
+    Returns (fire_at, offset) for the reminder to send next, or (None, None).
+    `sent` holds the offsets already sent for this deadline.
+
+    A reminder that fell due less than REMINDER_CATCH_UP_HOURS ago is still
+    sent (e.g. after downtime); when several are due only the latest goes
+    out, and offsets older than one already sent are never sent.
+    """
+    config = config or current_app.config
+    if deadline is None or status in config['CLOSED_STATUSES']:
+        return None, None
+
+    fires = sorted((fire_time(deadline, offset, schedule), offset) for offset in schedule.offsets)
+    latest_sent = max((at for at, offset in fires if offset in sent), default=None)
+    oldest_allowed = now - timedelta(hours=config['REMINDER_CATCH_UP_HOURS'])
+    pending = [(at, offset) for at, offset in fires
+               if offset not in sent and at >= oldest_allowed
+               and (latest_sent is None or at > latest_sent)]
+
+    due = [fire for fire in pending if fire[0] <= now]
+    if due:
+        return due[-1]
+    return pending[0] if pending else (None, None)
+
+def sent_offsets(application_ids):
+    """
+    {application_id: {(deadline, days_before), ...}} from the reminder ledger.
+    """
+    sent = {}
+    if not application_ids:
+        return sent
+    rows = db.session.query(ReminderLog.application_id, ReminderLog.deadline, ReminderLog.days_before) \
+        .filter(ReminderLog.application_id.in_(application_ids)).all()
+    for application_id, deadline, days in rows:
+        sent.setdefault(application_id, set()).add((deadline, days))
+    return sent
+
+def _offsets_for(sent, application_id, deadline):
+    return {days for sent_deadline, days in sent.get(application_id, ()) if sent_deadline == deadline}
+
+def save_next_reminders(plans):
+    """
+    Writes [(application_id, fire_at, offset), ...] in one executemany,
+    leaving updated_at alone since the user changed nothing.
+    """
+    if not plans:
+        return
+    table = Application.__table__
+    db.session.execute(
+        update(table).where(table.c.id == bindparam('_id'))
+        .values(next_reminder_at=bindparam('_at'), next_reminder_days=bindparam('_days'),
+                updated_at=table.c.updated_at),
+        [{'_id': ident, '_at': at, '_days': days} for ident, at, days in plans]
+    )
+
+def refresh_next_reminders(application_ids=None, user_id=None, now=None, batch_size=1000):
+    """
+    Recomputes next_reminder_at for the given applications, or all of a
+    user's, or every application when neither is given. Used after bulk
+    writes that bypass the ORM and when a user changes their preferences.
+    Returns the number of applications updated; the caller commits.
+    """
+    now = now or datetime.utcnow()
+    query = db.session.query(Application.id, Application.deadline, Application.status, Application.user_id)
+    if application_ids is not None:
+        query = query.filter(Application.id.in_(application_ids))
+    if user_id is not None:
+        query = query.filter(Application.user_id == user_id)
+
+    schedules = {}
+    updated = 0
+    last_id = 0
+    while True:
+        rows = query.filter(Application.id > last_id).order_by(Application.id).limit(batch_size).all()
+        if not rows:
+            return updated
+        last_id = rows[-1].id
+        sent = sent_offsets([row.id for row in rows])
+        plans = []
+        for row in rows:
+            if row.user_id not in schedules:
+                schedules[row.user_id] = schedule_for(db.session.get(User, row.user_id))
+            at, days = plan_reminder(row.deadline, row.status, schedules[row.user_id],
+                                     _offsets_for(sent, row.id, row.deadline), now)
+            plans.append((row.id, at, days))
+        save_next_reminders(plans)
+        updated += len(plans)
+
+@event.listens_for(db.session, 'before_flush')
+def schedule_reminders(session, flush_context, instances):
+    """
+    Recomputes next_reminder_at for applications that are new or whose
+    deadline or status is changing, as part of the same flush.
+    """
+    now = datetime.utcnow()
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Application) or obj.user_id is None:
+            continue
+        state = inspect(obj)
+        if not state.pending and not (state.attrs.deadline.history.has_changes() or
+                                      state.attrs.status.history.has_changes()):
+            continue
+        sent = set()
+        if state.persistent:
+            sent = {days for days, in session.query(ReminderLog.days_before).filter(
+                ReminderLog.application_id == obj.id, ReminderLog.deadline == obj.deadline)}
+        user = session.get(User, obj.user_id)
+        obj.next_reminder_at, obj.next_reminder_days = plan_reminder(
+            obj.deadline, obj.status or 'Not Started', schedule_for(user), sent, now)
@@ -0,0 +1,105 @@
+import logging
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from sqlalchemy import case, delete, func
+from app import db
+from app.models import Application, User, DailyRollup
+from app.services.stats import DEADLINE_BUCKETS
+
+logger = logging.getLogger(__name__)
+
+DIMENSIONS = ('status', 'type', 'country', 'deadline')
+
+def deadline_bucket(day):
+    """
+    SQL expression naming an application's deadline bucket relative to
+    `day`: overdue, one of DEADLINE_BUCKETS, later or none.
+    """
+    whens = [(Application.deadline.is_(None), 'none'),
+             (Application.deadline < day, 'overdue')]
+    for name, (start, end) in DEADLINE_BUCKETS.items():
+        whens.append((Application.deadline.between(day + timedelta(days=start), day + timedelta(days=end)), name))
+    return case(*whens, else_='later')
+
+def compute_rollup(day):
+    """
+    {dimension: Counter(value=count)} over every user's applications. The
+    table is scanned once, grouped on all four dimensions together; the
+    per-dimension totals are summed from those few hundred groups.
+    """
+    groups = (Application.status, Application.application_type,
+              func.coalesce(Application.country, ''), deadline_bucket(day))
+    rows = db.session.query(*groups, func.count(Application.id)).group_by(*groups).all()
+
+    totals = {dimension: Counter() for dimension in DIMENSIONS}
+    for status, application_type, country, bucket, count in rows:
+        for dimension, value in zip(DIMENSIONS, (status, application_type, country, bucket)):
+            totals[dimension][value or ''] += count
+
+    totals['total'] = Counter({
+        'applications': sum(count for *_, count in rows),
+        'users': db.session.query(func.count(User.id)).scalar() or 0,
+    })
+    return totals
+
+def write_rollup(day, totals):
+    """
+    Replaces the snapshot for `day` in the caller's transaction, so a
+    re-run for the same day never double counts.
+    """
+    db.session.execute(delete(DailyRollup).where(DailyRollup.day == day))
+    rows = [{'day': day, 'dimension': dimension, 'value': value[:100], 'count': count}
+            for dimension, counts in totals.items() for value, count in counts.items()]
+    if rows:
+        db.session.execute(DailyRollup.__table__.insert(), rows)
+    return len(rows)
+
+def snapshot_daily(app, day=None):
+    """
+    Writes today's (UTC) rollup unless it already exists, and drops
+    snapshots older than ROLLUP_RETENTION_DAYS. Safe to call on every
+    scheduler tick; returns the number of rows written.
+    """
+    with app.app_context():
+        day = day or datetime.utcnow().date()
+        if db.session.query(DailyRollup.id).filter(DailyRollup.day == day).first() is not None:
+            return 0
+
+        written = write_rollup(day, compute_rollup(day))
+        cutoff = day - timedelta(days=app.config['ROLLUP_RETENTION_DAYS'])
+        db.session.execute(delete(DailyRollup).where(DailyRollup.day < cutoff))
+        db.session.commit()
+        logger.info("Wrote %d rollup row(s) for %s", written, day)
+        return written
+
+def latest_snapshot():
+    """
+    (day, {dimension: {value: count}}) for the most recent snapshot, or
+    (None, {}) before the first one has been taken.
+    """
+    day = db.session.query(func.max(DailyRollup.day)).scalar()
+    if day is None:
+        return None, {}
+    snapshot = defaultdict(dict)
+    for dimension, value, count in db.session.query(DailyRollup.dimension, DailyRollup.value, DailyRollup.count) \
+            .filter(DailyRollup.day == day) \
+            .order_by(DailyRollup.dimension, DailyRollup.count.desc(), DailyRollup.value):
+        snapshot[dimension][value] = count
+    return day, dict(snapshot)
+
+def trend(dimension, start, end):
+    """
+    Daily series for one dimension between `start` and `end` inclusive:
+    {'days': [...], 'series': {value: [count per day]}}. Days without a
+    snapshot are left out; values missing on a day count as 0.
+    """
+    rows = db.session.query(DailyRollup.day, DailyRollup.value, DailyRollup.count) \
+        .filter(DailyRollup.dimension == dimension, DailyRollup.day.between(start, end)) \
+        .order_by(DailyRollup.day).all()
+
+    days = sorted({day for day, _, _ in rows})
+    position = {day: index for index, day in enumerate(days)}
+    series = defaultdict(lambda: [0] * len(days))
+    for day, value, count in rows:
+        series[value][position[day]] = count
+    return {'days': [day.isoformat() for day in days], 'series': dict(series)}
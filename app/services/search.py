@@ -0,0 +1,201 @@
+import re
+import weakref
+from sqlalchemy import event, or_, text, table, column
+from sqlalchemy.exc import OperationalError
+from flask import current_app
+from app import db
+from app.models import Application, Task
+
+# Standalone FTS5 table keyed by application id (rowid). user_id is stored
+# UNINDEXED so matches can be scoped to one user; `tasks` holds the
+# concatenated descriptions of the application's tasks.
+FTS_TABLE = 'application_fts'
+
+CREATE_FTS_SQL = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+    user_id UNINDEXED, title, institution, program_role, notes, tasks,
+    tokenize = 'unicode61 remove_diacritics 2'
+)
+"""
+
+REFRESH_FTS_SQL = f"""
+INSERT INTO {FTS_TABLE} (rowid, user_id, title, institution, program_role, notes, tasks)
+SELECT a.id, a.user_id, a.title, a.institution, a.program_role, a.notes,
+       (SELECT group_concat(t.description, ' ') FROM task t WHERE t.application_id = a.id)
+FROM application a
+"""
+
+fts = table(FTS_TABLE, column('rowid'), column('user_id'), column('rank'))
+
+# Columns the typeahead matches against
+TYPEAHEAD_COLUMNS = ('title', 'institution')
+
+# Columns the typeahead returns: what a row of the list page's table shows
+TYPEAHEAD_FIELDS = ('id', 'title', 'institution', 'application_type', 'deadline', 'status',
+                    'application_url', 'task_count', 'completed_task_count', 'document_count',
+                    'document_bytes')
+
+# engine -> whether the FTS table exists, so the check runs once per engine
+_available = weakref.WeakKeyDictionary()
+
+def search_index_available(connection):
+    engine = connection.engine
+    if engine not in _available:
+        if engine.dialect.name != 'sqlite':
+            _available[engine] = False
+        else:
+            found = connection.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {'name': FTS_TABLE}
+            ).first()
+            _available[engine] = found is not None
+    return _available[engine]
+
+def use_search_index():
+    return current_app.config.get('SEARCH_FTS_ENABLED', True) and \
+        search_index_available(db.session.connection())
+
+def build_match_expression(search_query, columns=None):
+    """
+    Turns free text into an FTS5 query where every word must match as a
+    prefix, optionally only within `columns`. Quoting each term keeps FTS5
+    syntax characters inert. Returns None when the input has no searchable
+    words.
+    """
+    terms = re.findall(r'\w+', search_query)
+    if not terms:
+        return None
+    match = ' '.join(f'"{term}"*' for term in terms)
+    if columns:
+        match = f"{{{' '.join(columns)}}} : ({match})"
+    return match
+
+def _like_filter(search_query):
+    search = f"%{search_query}%"
+    return or_(
+        Application.title.ilike(search),
+        Application.institution.ilike(search),
+        Application.program_role.ilike(search)
+    )
+
+def _match_subquery(user_id, match):
+    return db.select(fts.c.rowid) \
+        .where(text(f'{FTS_TABLE} MATCH :match').bindparams(match=match)) \
+        .where(fts.c.user_id == user_id)
+
+def filter_by_search(query, user_id, search_query):
+    """
+    Restricts an Application query to rows matching `search_query`, using the
+    FTS index when present and falling back to LIKE scans otherwise.
+    """
+    match = build_match_expression(search_query)
+    if match and use_search_index():
+        return query.filter(Application.id.in_(_match_subquery(user_id, match)))
+    return query.filter(_like_filter(search_query))
+
+def rank_by_search(query, user_id, search_query, limit):
+    """
+    Like filter_by_search, but returns the best `limit` matches ordered by
+    FTS5 bm25 rank. Without the index it returns LIKE matches by deadline.
+    """
+    match = build_match_expression(search_query)
+    if match and use_search_index():
+        ranked = _match_subquery(user_id, match).add_columns(fts.c.rank).subquery()
+        query = query.join(ranked, ranked.c.rowid == Application.id) \
+            .order_by(ranked.c.rank, Application.id)
+    else:
+        query = query.filter(_like_filter(search_query)) \
+            .order_by(Application.deadline.asc(), Application.id.asc())
+    return query.limit(limit).all()
+
+def _like_prefix(term):
+    # `\w` matches `_`, which LIKE would otherwise treat as a wildcard
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+def typeahead(user_id, search_query, limit, filters=None):
+    """
+    Up to `limit` rows of TYPEAHEAD_FIELDS whose title or institution has a
+    word starting with each term of `search_query`, best match first.
+    `filters` maps Application attributes to required values, as set by
+    the list page's status, type and country selects. Only the index and
+    the application rows it finds are read, so it is cheap enough to run
+    on every keystroke.
+    """
+    match = build_match_expression(search_query, TYPEAHEAD_COLUMNS)
+    if match is None:
+        return []
+
+    query = db.session.query(*[getattr(Application, field) for field in TYPEAHEAD_FIELDS]) \
+        .filter(Application.user_id == user_id)
+    for attr, value in (filters or {}).items():
+        query = query.filter(getattr(Application, attr) == value)
+    if use_search_index():
+        ranked = _match_subquery(user_id, match).add_columns(fts.c.rank).subquery()
+        query = query.join(ranked, ranked.c.rowid == Application.id) \
+            .order_by(ranked.c.rank, Application.id)
+    else:
+        for term in re.findall(r'\w+', search_query):
+            prefix = _like_prefix(term)
+            query = query.filter(or_(*[condition for field in (Application.title, Application.institution)
+                                       for condition in (field.ilike(prefix, escape='\\'),
+                                                         field.ilike(f'% {prefix}', escape='\\'))]))
+        query = query.order_by(Application.title, Application.id)
+    return query.limit(limit).all()
+
+def refresh_search_index(connection, application_ids):
+    """
+    Rewrites the index rows for `application_ids` from the live tables.
+    Ids whose application no longer exists are simply removed.
+    """
+    ids = sorted(application_ids)
+    if not ids:
+        return
+    params = {f'id{i}': ident for i, ident in enumerate(ids)}
+    placeholders = ', '.join(f':{name}' for name in params)
+    connection.execute(text(f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})'), params)
+    connection.execute(text(f'{REFRESH_FTS_SQL} WHERE a.id IN ({placeholders})'), params)
+
+def refresh_user_search_index(connection, user_id, after_id=0):
+    """
+    Re-indexes a user's applications with ids above `after_id`; used after
+    bulk inserts that do not report the ids they created.
+    """
+    params = {'user_id': user_id, 'after_id': after_id}
+    connection.execute(text(f'DELETE FROM {FTS_TABLE} WHERE rowid > :after_id AND user_id = :user_id'), params)
+    connection.execute(text(f'{REFRESH_FTS_SQL} WHERE a.user_id = :user_id AND a.id > :after_id'), params)
+
+def rebuild_search_index(connection):
+    connection.execute(text(f'DELETE FROM {FTS_TABLE}'))
+    connection.execute(text(REFRESH_FTS_SQL))
+
+@event.listens_for(db.metadata, 'after_create')
+def create_search_index(target, connection, **kw):
+    if connection.dialect.name != 'sqlite':
+        return
+    try:
+        connection.execute(text(CREATE_FTS_SQL))
+        _available[connection.engine] = True
+    except OperationalError:
+        # SQLite built without FTS5; searches use the LIKE fallback
+        _available[connection.engine] = False
+
+@event.listens_for(db.session, 'after_flush')
+def sync_search_index(session, flush_context):
+    """
+    Keeps the FTS table in step with Application and Task writes made through
+    the ORM, inside the same transaction as the write itself.
+    """
+    touched = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Application):
+            if obj.id is not None and (obj in session.deleted or obj in session.new or session.is_modified(obj)):
+                touched.add(obj.id)
+        elif isinstance(obj, Task):
+            if obj.application_id is not None:
+                touched.add(obj.application_id)
+
+    if not touched:
+        return
+    connection = session.connection()
+    if search_index_available(connection):
+        refresh_search_index(connection, touched)
@@ -0,0 +1,78 @@
+from datetime import date, timedelta
+from sqlalchemy import func, case
+from app import db
+from app.models import Application
+
+# Deadline buckets shown on the dashboard, as inclusive day offsets from today.
+DEADLINE_BUCKETS = {
+    'upcoming_7': (0, 7),
+    'upcoming_14': (8, 14),
+    'upcoming_30': (15, 30),
+}
+
+def count_by(user_id, column):
+    """
+    Returns {value: count} for a user's applications grouped on `column`.
+    """
+    rows = db.session.query(column, func.count(Application.id)) \
+        .filter(Application.user_id == user_id) \
+        .group_by(column) \
+        .all()
+    return {value: count for value, count in rows}
+
+def get_deadline_counts(user_id, today=None):
+    """
+    Counts overdue applications and those falling in each DEADLINE_BUCKETS
+    window with a single CASE-bucketed aggregate.
+    """
+    today = today or date.today()
+
+    columns = [func.count(Application.id).label('total'),
+               func.sum(case((Application.deadline < today, 1), else_=0)).label('overdue')]
+    for name, (start, end) in DEADLINE_BUCKETS.items():
+        window = Application.deadline.between(today + timedelta(days=start), today + timedelta(days=end))
+        columns.append(func.sum(case((window, 1), else_=0)).label(name))
+
+    row = db.session.query(*columns).filter(Application.user_id == user_id).one()
+    return {key: value or 0 for key, value in row._mapping.items()}
+
+def get_deadlines_between(user_id, start, end=None, limit=None):
+    """
+    Applications with start <= deadline <= end (either bound optional),
+    soonest first, capped at `limit` rows.
+    """
+    query = Application.query.filter(Application.user_id == user_id)
+    if start is not None:
+        query = query.filter(Application.deadline >= start)
+    if end is not None:
+        query = query.filter(Application.deadline <= end)
+    query = query.order_by(Application.deadline.asc(), Application.id.asc())
+    if limit:
+        query = query.limit(limit)
+    return query.all()
+
+def get_overdue(user_id, today=None, limit=None):
+    today = today or date.today()
+    return get_deadlines_between(user_id, None, today - timedelta(days=1), limit=limit)
+
+def get_similar_applications(application, limit=3):
+    """
+    Up to `limit` of the user's other applications at the same institution,
+    topped up with ones of the same type. Both lookups are bounded range
+    scans on the (user_id, institution, deadline) and (user_id,
+    application_type, deadline) indexes, already in deadline order.
+    """
+    base = Application.query.filter(Application.user_id == application.user_id,
+                                    Application.id != application.id)
+
+    similar = base.filter(Application.institution == application.institution) \
+        .order_by(Application.deadline.asc(), Application.id.asc()) \
+        .limit(limit).all()
+
+    if len(similar) < limit:
+        similar += base.filter(Application.application_type == application.application_type,
+                               Application.institution != application.institution) \
+            .order_by(Application.deadline.asc(), Application.id.asc()) \
+            .limit(limit - len(similar)).all()
+
+    return similar
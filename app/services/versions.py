@@ -0,0 +1,127 @@
+import functools
+import hashlib
+import os
+import time
+from datetime import date, datetime
+from flask import current_app, request, session, make_response, g, has_app_context
+from flask_login import current_user
+from sqlalchemy import event, or_, select, update
+from app import db
+from app.models import User, Application, Task, Document
+
+def source_digest(root=None):
+    """
+    Hash of the application's Python modules and templates (static files
+    and uploads excluded). Every worker running the same code computes the
+    same value, and it survives restarts until the code changes.
+    """
+    root = root or os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    digest = hashlib.sha1()
+    for directory, subdirs, names in os.walk(root):
+        subdirs[:] = sorted(name for name in subdirs if name not in ('static', '__pycache__'))
+        for name in sorted(names):
+            if name.endswith(('.py', '.html')):
+                path = os.path.join(directory, name)
+                digest.update(os.path.relpath(path, root).encode())
+                with open(path, 'rb') as fh:
+                    digest.update(fh.read())
+    return digest.hexdigest()[:12]
+
+SOURCE_DIGEST = source_digest()
+
+def release_id():
+    """
+    Identifies the release serving a request in ETags and cache keys:
+    CACHE_VERSION when set, otherwise the source digest.
+    """
+    return current_app.config.get('CACHE_VERSION') or SOURCE_DIGEST
+
+def get_data_version(user_id):
+    """
+    Current data version of a user, read from the database rather than the
+    (possibly cached) User object.
+    """
+    return db.session.query(User.data_version).filter(User.id == user_id).scalar() or 0
+
+def current_data_version():
+    """
+    The logged-in user's data version, read once per request.
+    """
+    if 'data_version' not in g:
+        g.data_version = get_data_version(current_user.id)
+    return g.data_version
+
+def bump_data_version(connection, user_ids=(), application_ids=()):
+    """
+    Increments data_version (and sets data_changed_at) for `user_ids` and for
+    the owners of `application_ids`, inside the caller's transaction. Set-based writes that
+    bypass the ORM must call this themselves.
+    """
+    user_ids, application_ids = set(user_ids), set(application_ids)
+    if not user_ids and not application_ids:
+        return
+    owners = select(Application.user_id).where(Application.id.in_(application_ids))
+    connection.execute(
+        update(User.__table__)
+        .where(or_(User.id.in_(user_ids), User.id.in_(owners)))
+        .values(data_version=User.data_version + 1, data_changed_at=datetime.utcnow())
+    )
+    if has_app_context():
+        g.pop('data_version', None)
+
+@event.listens_for(db.session, 'after_flush')
+def track_data_versions(session, flush_context):
+    user_ids, application_ids = set(), set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        if isinstance(obj, Application):
+            user_ids.add(obj.user_id)
+        elif isinstance(obj, (Task, Document)):
+            application_ids.add(obj.application_id)
+    user_ids.discard(None)
+    application_ids.discard(None)
+    bump_data_version(session.connection(), user_ids, application_ids)
+
+def csrf_epoch():
+    # Pages embed CSRF tokens, which expire; rotate the ETag at half the
+    # token lifetime so a revalidated page never carries a dead token
+    limit = current_app.config.get('WTF_CSRF_TIME_LIMIT', 3600)
+    if not current_app.config.get('WTF_CSRF_ENABLED', True) or not limit:
+        return 0
+    return int(time.time() // max(1, limit // 2))
+
+def compute_etag(user_id, version):
+    parts = [
+        release_id(),
+        str(user_id),
+        str(version),
+        date.today().isoformat(),
+        str(csrf_epoch()),
+        request.endpoint or '',
+        request.query_string.decode('latin-1'),
+    ]
+    return hashlib.sha1('|'.join(parts).encode()).hexdigest()
+
+def conditional_view(view):
+    """
+    Answers GETs with 304 Not Modified when the client's ETag still matches
+    the user's data version, before the view runs any query or renders
+    anything. Apply inside login_required. Requests with pending flash
+    messages always render, so the messages are shown.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if request.method != 'GET' or session.get('_flashes'):
+            return view(*args, **kwargs)
+
+        etag = compute_etag(current_user.id, current_data_version())
+        if request.if_none_match.contains_weak(etag):
+            response = current_app.response_class(status=304)
+        else:
+            response = make_response(view(*args, **kwargs))
+        response.set_etag(etag, weak=True)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        response.vary.add('Cookie')
+        return response
+    return wrapper
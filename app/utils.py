@@ -2,6 +2,8 @@
 from datetime import datetime, date
 from flask import url_for
 import csv
+import json
+import zlib
 from io import StringIO
 
 def get_status_color(status):
@@ -44,35 +46,73 @@ def format_date(value, format='%b %d, %Y'):
         return value.strftime(format)
     return value
 
-def export_applications_to_csv(applications):
-    output = StringIO()
-    writer = csv.writer(output)
+EXPORT_COLUMNS = [
+    'Title', 'Type', 'Institution', 'Program/Role', 'Country',
+    'Deadline', 'Status', 'Days Remaining', 'Application URL', 'Notes',
+    'Created', 'Updated'
+]
+
+def application_export_row(app):
+    return [
+        app.title,
+        app.application_type,
+        app.institution,
+        app.program_role or '',
+        app.country or '',
+        app.deadline.strftime('%Y-%m-%d') if app.deadline else '',
+        app.status,
+        app.days_remaining() or '',
+        app.application_url or '',
+        app.notes or '',
+        app.created_at.strftime('%Y-%m-%d %H:%M'),
+        app.updated_at.strftime('%Y-%m-%d %H:%M') if app.updated_at else ''
+    ]
+
+def iter_applications_csv(applications, flush_every=100):
+    """
+    Yields the CSV export in chunks of `flush_every` rows, reusing a single
+    small buffer so memory stays flat regardless of how many rows there are.
+    """
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
     
-    # Write header
-    writer.writerow([
-        'Title', 'Type', 'Institution', 'Program/Role', 'Country',
-        'Deadline', 'Status', 'Days Remaining', 'Application URL', 'Notes',
-        'Created', 'Updated'
-    ])
+    for i, app in enumerate(applications, 1):
+        writer.writerow(application_export_row(app))
+        if i % flush_every == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
     
-    # Write data
+    yield buffer.getvalue()
+
+def iter_applications_jsonl(applications, flush_every=100):
+    """
+    Same rows as the CSV export, one JSON object per line keyed by column name.
+    """
+    lines = []
     for app in applications:
-        writer.writerow([
-            app.title,
-            app.application_type,
-            app.institution,
-            app.program_role or '',
-            app.country or '',
-            app.deadline.strftime('%Y-%m-%d') if app.deadline else '',
-            app.status,
-            app.days_remaining() or '',
-            app.application_url or '',
-            app.notes or '',
-            app.created_at.strftime('%Y-%m-%d %H:%M'),
-            app.updated_at.strftime('%Y-%m-%d %H:%M') if app.updated_at else ''
-        ])
+        lines.append(json.dumps(dict(zip(EXPORT_COLUMNS, application_export_row(app)))))
+        if len(lines) >= flush_every:
+            yield '\n'.join(lines) + '\n'
+            lines = []
     
-    return output.getvalue()
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+def gzip_chunks(chunks, level=6):
+    """
+    Compresses a stream of text chunks into a gzip byte stream on the fly.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+def export_applications_to_csv(applications):
+    return ''.join(iter_applications_csv(applications))
 
 def get_upcoming_deadlines(applications, days=7):
     today = date.today()
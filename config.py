@@ -9,6 +9,23 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
         'sqlite:///' + os.path.join(basedir, 'app.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    
+    # Applied to every new SQLite connection; {} keeps SQLite's defaults.
+    # WAL lets readers run alongside the single writer, busy_timeout makes a
+    # blocked writer wait instead of failing with "database is locked".
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'busy_timeout': 5000,
+        'synchronous': 'NORMAL',
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64 * 1024,  # KiB
+        'temp_store': 'MEMORY',
+    }
+    
+    # Read-only views (list, dashboard, stats, export) use their own pool:
+    # READ_DATABASE_URL if set, else a second pool on the same SQLite file
+    READ_ONLY_SESSIONS = os.environ.get('READ_ONLY_SESSIONS', '1') == '1'
+    SQLALCHEMY_READ_DATABASE_URI = os.environ.get('READ_DATABASE_URL')
     REMEMBER_COOKIE_DURATION = timedelta(days=30)
     
     # Upload Configuration
@@ -16,7 +33,111 @@ class Config:
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx', 'txt', 'png', 'jpg', 'jpeg'}
     
+    # Downloads: set USE_X_SENDFILE=1 behind Apache/lighttpd, or an nginx
+    # `internal` location aliased to UPLOAD_FOLDER for X-Accel-Redirect
+    USE_X_SENDFILE = os.environ.get('USE_X_SENDFILE') == '1'
+    DOWNLOAD_ACCEL_REDIRECT_PREFIX = os.environ.get('DOWNLOAD_ACCEL_REDIRECT_PREFIX')
+    DOWNLOAD_MAX_AGE = 3600
+    
+    # Pagination
+    APPLICATIONS_PER_PAGE = 25
+    APPLICATIONS_MAX_PER_PAGE = 100
+    DASHBOARD_LIST_LIMIT = 10
+    SIMILAR_APPLICATIONS_LIMIT = 3
+    
+    # Bulk endpoints
+    BULK_MAX_ITEMS = 500
+    
+    # Search: use the SQLite FTS5 index when it exists, else LIKE scans
+    SEARCH_FTS_ENABLED = True
+    TYPEAHEAD_LIMIT = 8
+    TYPEAHEAD_MAX_LIMIT = 20
+    
+    # Export / import
+    EXPORT_BATCH_SIZE = 500
+    IMPORT_BATCH_SIZE = 500
+    IMPORT_MAX_ERRORS = 1000
+    
+    # Part of every ETag; set per release so clients revalidate after a
+    # deploy. Unset, a hash of the code and templates is used instead.
+    CACHE_VERSION = os.environ.get('CACHE_VERSION')
+    
+    # Rendered template fragments: 'memory' (per-process LRU), 'sqlite'
+    # (one file shared by all workers on a host) or 'null' to disable
+    FRAGMENT_CACHE_BACKEND = os.environ.get('FRAGMENT_CACHE_BACKEND') or 'memory'
+    FRAGMENT_CACHE_PATH = os.environ.get('FRAGMENT_CACHE_PATH')
+    FRAGMENT_CACHE_MAX_ENTRIES = 1000
+    FRAGMENT_CACHE_TTL = 3600
+    
+    # How often calendar apps are asked to poll the .ics deadline feed
+    CALENDAR_REFRESH_MINUTES = 15
+    
+    # Password hashing. PASSWORD_HASH_METHOD must be the full Werkzeug method
+    # string as stored in hashes; existing hashes are upgraded at login.
+    # Hashing runs in a pool of PASSWORD_HASH_WORKERS processes (0 hashes in
+    # the request thread) and logins get a 503 once MAX_PENDING are queued.
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD') or 'scrypt:32768:8:1'
+    PASSWORD_SALT_LENGTH = 16
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS') or 2)
+    PASSWORD_HASH_MAX_PENDING = 32
+    PASSWORD_HASH_TIMEOUT = 10
+    
+    # Flask-Login user cache, per worker process; 0 disables it
+    USER_CACHE_TTL = 30
+    USER_CACHE_MAX_ENTRIES = 1000
+    
+    # Users with these emails (comma-separated) can open /admin/stats
+    ADMIN_EMAILS = {email.strip().lower() for email in (os.environ.get('ADMIN_EMAILS') or '').split(',')
+                    if email.strip()}
+    
+    # Cross-user daily rollups behind the admin stats; ROLLUP_REPORT_DAYS is
+    # the default trend window
+    ROLLUP_RETENTION_DAYS = 730
+    ROLLUP_REPORT_DAYS = 30
+    
+    # Prometheus metrics at /metrics; set METRICS_TOKEN to require a bearer token
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED') == '1'
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    
     # Application settings
     APPLICATION_TYPES = ['Job', 'MSc', 'PhD', 'Fellowship', 'Summer Program']
     STATUS_CHOICES = ['Not Started', 'In Progress', 'Submitted', 'Interview', 'Offer', 'Accepted', 'Rejected', 'Waitlisted']
-    COUNTRIES = ['United States', 'Canada', 'United Kingdom', 'Germany', 'France', 'Australia', 'Japan', 'China', 'Other']
\ No newline at end of file
+    COUNTRIES = ['United States', 'Canada', 'United Kingdom', 'Germany', 'France', 'Australia', 'Japan', 'China', 'Other']
+    
+    # Statuses that no longer need deadline reminders
+    CLOSED_STATUSES = ['Submitted', 'Accepted', 'Rejected', 'Waitlisted']
+    
+    # Reminders: days before a deadline at which a reminder goes out, and the
+    # local hour it is sent at; users can override both and their timezone.
+    # Reminders missed by more than REMINDER_CATCH_UP_HOURS are skipped.
+    REMINDER_INTERVALS = [7, 3, 1]
+    REMINDER_SEND_HOUR = 9
+    REMINDER_CATCH_UP_HOURS = 24
+    REMINDER_TICK_SECONDS = 300
+    # Users (with all their due reminders) handled per batch
+    REMINDER_BATCH_SIZE = 500
+    
+    # Outgoing email: 'console' prints messages, 'smtp' delivers them
+    MAIL_BACKEND = os.environ.get('MAIL_BACKEND') or 'console'
+    MAIL_SERVER = os.environ.get('MAIL_SERVER') or 'localhost'
+    MAIL_PORT = int(os.environ.get('MAIL_PORT') or 25)
+    MAIL_USE_TLS = os.environ.get('MAIL_USE_TLS') == '1'
+    MAIL_USERNAME = os.environ.get('MAIL_USERNAME')
+    MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
+    MAIL_DEFAULT_SENDER = os.environ.get('MAIL_DEFAULT_SENDER') or 'AppTrack Pro <noreply@apptrack.local>'
+    MAIL_TIMEOUT = 10
+    
+    # Scheduler leadership: one process holds a lease and runs the jobs;
+    # others take over SCHEDULER_LEASE_TTL seconds after it stops renewing
+    SCHEDULER_LEASE_TTL = 60
+    SCHEDULER_LEASE_RENEW_SECONDS = 15
+    SCHEDULER_TICK_SECONDS = 300
+    JOB_RUN_RETENTION_DAYS = 30
+    
+    # Email outbox delivery
+    MAIL_WORKERS = 2
+    MAIL_BATCH_SIZE = 50
+    MAIL_MAX_ATTEMPTS = 5
+    MAIL_RETRY_BASE_SECONDS = 60
+    MAIL_CLAIM_TIMEOUT = 300
+    OUTBOX_POLL_SECONDS = 30
\ No newline at end of file
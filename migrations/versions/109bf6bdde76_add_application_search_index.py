@@ -0,0 +1,47 @@
+"""Add FTS5 search index for applications
+
+Revision ID: 109bf6bdde76
+Revises: 1975e797b1a8
+Create Date: 2026-10-17 11:40:02.671930
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '109bf6bdde76'
+down_revision = '1975e797b1a8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Not autogenerated: FTS5 virtual tables are invisible to Alembic.
+    # Skipped silently on non-SQLite databases or SQLite builds without FTS5,
+    # in which case the app falls back to LIKE searches.
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return
+    try:
+        op.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS application_fts USING fts5(
+                user_id UNINDEXED, title, institution, program_role, notes, tasks,
+                tokenize = 'unicode61 remove_diacritics 2'
+            )
+        """)
+    except sa.exc.OperationalError:
+        return
+    op.execute("""
+        INSERT INTO application_fts (rowid, user_id, title, institution, program_role, notes, tasks)
+        SELECT a.id, a.user_id, a.title, a.institution, a.program_role, a.notes,
+               (SELECT group_concat(t.description, ' ') FROM task t WHERE t.application_id = a.id)
+        FROM application a
+    """)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return
+    op.execute('DROP TABLE IF EXISTS application_fts')
@@ -1,7 +1,11 @@
 # filename: run.py
-from app import create_app
+# Password hashing workers (app.services.passwords) import this file again
+# as __mp_main__ when it is the script being run; they only need Werkzeug,
+# so the app is not built there
+if __name__ != '__mp_main__':
+    from app import create_app
 
-app = create_app()
+    app = create_app()
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    app.run(debug=True, host='0.0.0.0', port=5000)
@@ -162,18 +162,6 @@ document.addEventListener('DOMContentLoaded', function() {
       });
   });
   
-  // Search with debounce
-  let searchTimeout;
-  const searchInput = document.getElementById('globalSearch');
-  if (searchInput) {
-      searchInput.addEventListener('input', function() {
-          clearTimeout(searchTimeout);
-          searchTimeout = setTimeout(() => {
-              this.form.submit();
-          }, 500);
-      });
-  }
-  
   // Initialize all charts if Chart.js is loaded
   if (typeof Chart !== 'undefined') {
       initializeCharts();
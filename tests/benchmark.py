@@ -0,0 +1,317 @@
+"""
+Performance benchmarks against a synthetic database.
+
+Seeds N users x M applications (with tasks and documents) into a temporary
+SQLite file, then times the hot paths through the test client and writes a
+JSON report. Run from the repository root:
+
+    python -m tests.benchmark --users 20 --apps 500 --output bench_results.json
+    python -m tests.benchmark --baseline bench_results.json --threshold 0.25
+
+With --baseline, scenarios whose median time grew by more than --threshold
+are listed and the exit status is 1. --seed-only DB_PATH just writes a
+seeded database for manual profiling.
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from urllib.parse import urlencode
+from flask import current_app
+from sqlalchemy import event
+from werkzeug.security import generate_password_hash
+from app import create_app, db
+from app.models import User, Application, Task, Document, Blob, ReminderLog, OutboxEmail
+from app.services.pagination import paginate
+from app.services.search import search_index_available, rebuild_search_index
+from app.services.notifications import check_upcoming_deadlines
+from app.services.reminders import refresh_next_reminders
+from app.services.counters import recount
+from config import Config
+
+PASSWORD = 'benchmark'
+
+WORDS = ['data', 'science', 'machine', 'learning', 'quantum', 'biology', 'software', 'engineer',
+         'research', 'analyst', 'physics', 'economics', 'design', 'policy', 'climate', 'robotics',
+         'systems', 'health', 'finance', 'chemistry', 'history', 'language', 'network', 'security']
+INSTITUTIONS = ['Stanford University', 'MIT', 'ETH Zurich', 'University of Toronto', 'Oxford',
+                'Cambridge', 'TU Munich', 'Sorbonne', 'University of Tokyo', 'Tsinghua University',
+                'Acme Corp', 'Globex', 'Initech', 'Umbrella Labs', 'ANU']
+TASKS = ['Write statement of purpose', 'Request transcripts', 'Ask for recommendation letters',
+         'Update CV', 'Pay application fee', 'Prepare for interview', 'Submit test scores']
+FILE_TYPES = ['resume', 'cover_letter', 'transcript', 'other']
+
+def benchmark_config(database_path):
+    class BenchmarkConfig(Config):
+        TESTING = True
+        WTF_CSRF_ENABLED = False
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{database_path}'
+    return BenchmarkConfig
+
+def seed_database(users, apps_per_user, tasks_per_app, documents_per_app, seed=0, batch_size=5000):
+    """
+    Fills the current app's database with deterministic synthetic data using
+    Core executemany inserts. Deadlines spread from 60 days ago to 120 days
+    ahead so overdue, upcoming and reminder buckets are all populated.
+    """
+    config = current_app.config
+    rng = random.Random(seed)
+    today = date.today()
+    now = datetime.utcnow()
+    password_hash = generate_password_hash(PASSWORD)
+
+    db.session.execute(User.__table__.insert(), [
+        {'username': f'bench{i}', 'email': f'bench{i}@example.com',
+         'password_hash': password_hash, 'created_at': now}
+        for i in range(1, users + 1)
+    ])
+    user_ids = [ident for ident, in db.session.query(User.id).order_by(User.id)]
+
+    # A small pool of shared blobs, as deduplicated uploads would produce
+    blobs = [f'{rng.getrandbits(256):064x}' for _ in range(max(1, documents_per_app * 10))]
+    blob_refs = dict.fromkeys(blobs, 0)
+
+    def flush(table, rows):
+        if rows:
+            db.session.execute(table.insert(), rows)
+            rows.clear()
+
+    applications, tasks, documents = [], [], []
+    for user_id in user_ids:
+        for _ in range(apps_per_user):
+            title = ' '.join(rng.sample(WORDS, 3)).title()
+            created = now - timedelta(days=rng.randint(0, 365), seconds=rng.randint(0, 86400))
+            applications.append({
+                'user_id': user_id,
+                'title': title,
+                'application_type': rng.choice(config['APPLICATION_TYPES']),
+                'institution': rng.choice(INSTITUTIONS),
+                'program_role': ' '.join(rng.sample(WORDS, 2)).title(),
+                'country': rng.choice(config['COUNTRIES']),
+                'deadline': today + timedelta(days=rng.randint(-60, 120)),
+                'status': rng.choice(config['STATUS_CHOICES']),
+                'application_url': f'https://example.com/apply/{rng.getrandbits(32):08x}',
+                'notes': ' '.join(rng.choices(WORDS, k=rng.randint(5, 30))),
+                'created_at': created,
+                'updated_at': created,
+            })
+            if len(applications) >= batch_size:
+                flush(Application.__table__, applications)
+    flush(Application.__table__, applications)
+
+    for (application_id,) in db.session.query(Application.id).order_by(Application.id):
+        for description in rng.sample(TASKS, min(tasks_per_app, len(TASKS))):
+            tasks.append({'application_id': application_id, 'description': description,
+                          'is_completed': rng.random() < 0.4, 'created_at': now})
+        for n in range(documents_per_app):
+            sha256 = rng.choice(blobs)
+            blob_refs[sha256] += 1
+            documents.append({'application_id': application_id, 'filename': f'document_{n}.pdf',
+                              'filepath': os.path.join('blobs', sha256[:2], sha256[2:4], sha256),
+                              'file_type': rng.choice(FILE_TYPES), 'size': 100000,
+                              'sha256': sha256, 'uploaded_at': now})
+        if len(tasks) >= batch_size:
+            flush(Task.__table__, tasks)
+        if len(documents) >= batch_size:
+            flush(Document.__table__, documents)
+    flush(Task.__table__, tasks)
+    flush(Document.__table__, documents)
+
+    db.session.execute(Blob.__table__.insert(), [
+        {'sha256': sha256, 'size': 100000, 'ref_count': refs, 'created_at': now, 'updated_at': now}
+        for sha256, refs in blob_refs.items()
+    ])
+
+    connection = db.session.connection()
+    if search_index_available(connection):
+        rebuild_search_index(connection)
+    refresh_next_reminders()
+    recount(connection)
+    db.session.commit()
+    db.session.execute(db.text('ANALYZE'))
+    db.session.commit()
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, 'after_cursor_execute', self)
+
+    def __call__(self, *args):
+        self.count += 1
+
+def list_scenarios(config, search_term):
+    """
+    One scenario per combination of filter on/off, search on/off and sort
+    order. Each filter uses a single representative value; that covers every
+    query shape without timing every status x type x country product.
+    """
+    scenarios = []
+    sorts = ['deadline', 'created', 'status', 'title', 'relevance']
+    for status, app_type, country, search, sort in itertools.product(
+            ('all', config['STATUS_CHOICES'][1]), ('all', config['APPLICATION_TYPES'][1]),
+            ('all', config['COUNTRIES'][0]), ('', search_term), sorts):
+        if sort == 'relevance' and not search:
+            continue
+        params = {'status': status, 'type': app_type, 'country': country, 'q': search, 'sort': sort}
+        name = 'list[' + ','.join(f'{key}={value}' for key, value in params.items()
+                                  if value and value != 'all') + ']'
+        scenarios.append((name, '/applications/?' + urlencode(params), None))
+    return scenarios
+
+def run_scenario(run, repeat, counter, setup=None, warmup=1):
+    timings, queries = [], 0
+    for i in range(warmup + repeat):
+        if setup:
+            setup()
+        counter.count = 0
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        if i >= warmup:
+            timings.append(elapsed * 1000)
+            queries = counter.count
+    timings.sort()
+    return {
+        'runs': repeat,
+        'min_ms': round(timings[0], 3),
+        'median_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'max_ms': round(timings[-1], 3),
+        'queries': queries,
+    }
+
+def run_benchmarks(app, repeat):
+    client = app.test_client()
+    response = client.post('/auth/login', data={'email': 'bench1@example.com', 'password': PASSWORD})
+    if response.status_code != 302:
+        raise RuntimeError('Could not log in as the benchmark user')
+
+    def get(url):
+        def run():
+            response = client.get(url)
+            response.get_data()
+            if response.status_code != 200:
+                raise RuntimeError(f'GET {url} returned {response.status_code}')
+        return run
+
+    def reset_reminders():
+        with app.app_context():
+            ReminderLog.query.delete()
+            OutboxEmail.query.delete()
+            refresh_next_reminders()
+            db.session.commit()
+
+    scenarios = list_scenarios(app.config, 'data')
+    scenarios += [
+        ('search[q=research engineer,sort=relevance]', '/applications/?q=research+engineer&sort=relevance', None),
+        ('applications.api_search[q=res eng]', '/applications/api/search?q=res+eng', None),
+        ('dashboard.index', '/dashboard', None),
+        ('dashboard.api_stats', '/api/stats', None),
+        ('dashboard.export_csv', '/export/csv', None),
+        ('dashboard.export_csv[gzip]', '/export/csv?gzip=1', None),
+    ]
+
+    # Second page of the default listing, so cursor decoding is covered
+    with app.app_context():
+        user = User.query.filter_by(email='bench1@example.com').one()
+        page = paginate(Application.query.filter_by(user_id=user.id), 'deadline',
+                        app.config['APPLICATIONS_PER_PAGE'])
+    if page.next_cursor:
+        scenarios.append(('list[page=2]', '/applications/?' + urlencode({'after': page.next_cursor}), None))
+
+    with app.app_context():
+        counter = QueryCounter(db.engine)
+    if 'read_engine' in app.extensions:
+        event.listen(app.extensions['read_engine'], 'after_cursor_execute', counter)
+
+    results = {}
+    for name, url, setup in scenarios:
+        results[name] = run_scenario(get(url), repeat, counter, setup)
+        print(f"{name:80} {results[name]['median_ms']:10.2f} ms  {results[name]['queries']:4} queries")
+
+    results['notifications.check_upcoming_deadlines'] = run_scenario(
+        lambda: check_upcoming_deadlines(app), repeat, counter, setup=reset_reminders)
+    print(f"{'notifications.check_upcoming_deadlines':80} "
+          f"{results['notifications.check_upcoming_deadlines']['median_ms']:10.2f} ms")
+    return results
+
+def compare(results, baseline_path, threshold):
+    with open(baseline_path) as f:
+        baseline = json.load(f)['results']
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before and before['median_ms'] > 0:
+            ratio = result['median_ms'] / before['median_ms']
+            result['baseline_median_ms'] = before['median_ms']
+            result['change'] = round(ratio - 1, 4)
+            if ratio > 1 + threshold:
+                regressions.append((name, before['median_ms'], result['median_ms']))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--apps', type=int, default=200, help='applications per user')
+    parser.add_argument('--tasks', type=int, default=3, help='tasks per application')
+    parser.add_argument('--documents', type=int, default=1, help='documents per application')
+    parser.add_argument('--repeat', type=int, default=10, help='timed runs per scenario')
+    parser.add_argument('--seed', type=int, default=0, help='random seed for the data generator')
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--baseline', help='earlier results file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='allowed median slowdown before a scenario counts as a regression')
+    parser.add_argument('--seed-only', metavar='DB_PATH', help='write a seeded database and exit')
+    args = parser.parse_args(argv)
+    logging.getLogger('app.services.notifications').setLevel(logging.WARNING)
+
+    workdir = tempfile.mkdtemp(prefix='apptrack-bench-')
+    database_path = os.path.abspath(args.seed_only) if args.seed_only else os.path.join(workdir, 'bench.db')
+    if os.path.exists(database_path):
+        parser.error(f'{database_path} already exists')
+    app = create_app(benchmark_config(database_path))
+
+    with app.app_context():
+        start = time.perf_counter()
+        db.create_all()
+        seed_database(args.users, args.apps, args.tasks, args.documents, seed=args.seed)
+        seed_seconds = time.perf_counter() - start
+    print(f'Seeded {args.users} x {args.apps} applications in {seed_seconds:.1f}s ({database_path})')
+    if args.seed_only:
+        return 0
+
+    results = run_benchmarks(app, args.repeat)
+    regressions = compare(results, args.baseline, args.threshold) if args.baseline else []
+
+    report = {
+        'meta': {
+            'timestamp': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'parameters': {key: value for key, value in vars(args).items()
+                           if key in ('users', 'apps', 'tasks', 'documents', 'repeat', 'seed')},
+            'seed_seconds': round(seed_seconds, 3),
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f'Results written to {args.output}')
+
+    for name, before, after in regressions:
+        print(f'REGRESSION {name}: {before:.2f} ms -> {after:.2f} ms')
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
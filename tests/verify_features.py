@@ -114,5 +114,987 @@ class TestAdvancedFeatures(unittest.TestCase):
         self.assertEqual(count, 0)
         print("[OK] Document Deletion: Success")
 
+    def test_list_pagination(self):
+        self.login()
+        
+        # 1 app from setUp plus 11 more, paged 5 at a time
+        for i in range(11):
+            db.session.add(Application(
+                title=f'Paged App {i:02d}',
+                institution='Test Uni',
+                application_type='MSc',
+                deadline=datetime.utcnow() + timedelta(days=i % 3),
+                user_id=self.user.id
+            ))
+        db.session.commit()
+        
+        from app.services.pagination import paginate
+        for sort_by in ['deadline', 'created', 'status', 'title']:
+            query = Application.query.filter_by(user_id=self.user.id)
+            seen = []
+            page = paginate(query, sort_by, 5)
+            pages = [page]
+            seen.extend(a.id for a in page.items)
+            while page.has_next:
+                page = paginate(query, sort_by, 5, after=page.next_cursor)
+                pages.append(page)
+                seen.extend(a.id for a in page.items)
+            self.assertEqual(len(seen), 12)
+            self.assertEqual(len(set(seen)), 12)
+            
+            # Walking back from the last page returns the previous one
+            back = paginate(query, sort_by, 5, before=pages[-1].prev_cursor)
+            self.assertEqual([a.id for a in back.items], [a.id for a in pages[-2].items])
+        
+        response = self.client.get('/applications/?per_page=5&sort=title')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'12 Total', response.data)
+        self.assertIn(b'after=', response.data)
+        print("[OK] Keyset Pagination: Success")
+
+    def test_dashboard_stats(self):
+        self.login()
+        
+        today = datetime.utcnow().date()
+        for offset, status in [(-2, 'Submitted'), (3, 'In Progress'), (10, 'Submitted'), (20, 'Interview')]:
+            db.session.add(Application(
+                title=f'Due {offset}',
+                institution='Stats Uni',
+                application_type='PhD',
+                deadline=today + timedelta(days=offset),
+                status=status,
+                user_id=self.user.id
+            ))
+        db.session.commit()
+        
+        response = self.client.get('/api/stats')
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(data['total'], 5)
+        self.assertEqual(data['status_counts']['Submitted'], 2)
+        self.assertEqual(data['type_counts'], {'Job': 1, 'PhD': 4})
+        
+        from app.services.stats import get_deadline_counts
+        counts = get_deadline_counts(self.user.id, today)
+        self.assertEqual(counts['overdue'], 1)
+        self.assertEqual(counts['upcoming_7'], 1)
+        self.assertEqual(counts['upcoming_14'], 1)
+        self.assertEqual(counts['upcoming_30'], 2)
+        
+        response = self.client.get('/dashboard')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'Due 3', response.data)
+        print("[OK] Dashboard Aggregation: Success")
+
+    def test_streaming_export(self):
+        self.login()
+        
+        response = self.client.get('/export/csv')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_streamed)
+        lines = response.get_data(as_text=True).splitlines()
+        self.assertTrue(lines[0].startswith('Title,Type,Institution'))
+        self.assertTrue(lines[1].startswith('Test App,Job,Test Uni'))
+        
+        response = self.client.get('/export/csv?gzip=1')
+        self.assertEqual(response.mimetype, 'application/gzip')
+        import gzip
+        self.assertEqual(gzip.decompress(response.data).decode('utf-8').splitlines(), lines)
+        
+        response = self.client.get('/export/jsonl')
+        import json
+        rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['Institution'], 'Test Uni')
+        print("[OK] Streaming Export: Success")
+
+    def test_full_text_search(self):
+        self.login()
+        
+        from app.services.search import search_index_available
+        self.assertTrue(search_index_available(db.session.connection()))
+        
+        other = Application(
+            title='Robotics Fellowship',
+            institution='Carnegie Mellon',
+            application_type='Fellowship',
+            notes='Ask Prof. Hamilton for a reference',
+            deadline=datetime.utcnow() + timedelta(days=10),
+            user_id=self.user.id
+        )
+        db.session.add(other)
+        db.session.commit()
+        db.session.add(Task(description='Request transcripts', application_id=self.application.id))
+        db.session.commit()
+        
+        def search(q, sort='deadline'):
+            response = self.client.get(f'/applications/?q={q}&sort={sort}')
+            self.assertEqual(response.status_code, 200)
+            return response.data
+        
+        # Prefix matching across notes and task descriptions
+        self.assertIn(b'Robotics Fellowship', search('hamil'))
+        self.assertNotIn(b'Test App', search('hamil'))
+        self.assertIn(b'Test App', search('transcr'))
+        self.assertIn(b'Robotics Fellowship', search('carn mell', sort='relevance'))
+        
+        # Edits and deletes are reflected in the index
+        other.notes = 'No reference needed'
+        db.session.commit()
+        self.assertNotIn(b'Robotics Fellowship', search('hamil'))
+        
+        # LIKE fallback when the index is disabled
+        self.app.config['SEARCH_FTS_ENABLED'] = False
+        self.assertIn(b'Robotics Fellowship', search('botics'))
+        print("[OK] Full-Text Search: Success")
+
+    def test_deadline_reminders(self):
+        from unittest import mock
+        from app.models import ReminderLog
+        from app.services import notifications
+        
+        today = datetime.utcnow().date()
+        for days, status in [(7, 'Not Started'), (3, 'In Progress'), (1, 'Submitted'), (5, 'Not Started')]:
+            db.session.add(Application(
+                title=f'Due in {days}',
+                institution='Reminder Uni',
+                application_type='MSc',
+                deadline=today + timedelta(days=days),
+                status=status,
+                user_id=self.user.id
+            ))
+        db.session.commit()
+        
+        sent = []
+        def capture(user, subject, body):
+            sent.append((user.id, subject, body))
+        
+        # Reminders go out at 09:00 UTC by default; check at the end of the day
+        now = datetime.combine(today, datetime.max.time())
+        with mock.patch.object(notifications, 'send_email_reminder', side_effect=capture):
+            self.assertEqual(notifications.check_upcoming_deadlines(self.app, now=now), 1)
+            user_id, subject, body = sent[0]
+            self.assertEqual(user_id, self.user.id)
+            self.assertIn('Due in 7', body)
+            self.assertIn('Due in 3', body)
+            self.assertNotIn('Due in 1', body)
+            self.assertEqual(ReminderLog.query.count(), 2)
+            
+            # Re-running is a no-op thanks to the ledger
+            self.assertEqual(notifications.check_upcoming_deadlines(self.app, now=now), 0)
+            self.assertEqual(len(sent), 1)
+        print("[OK] Deadline Reminders: Success")
+
+    def test_email_outbox(self):
+        from unittest import mock
+        from app.models import OutboxEmail
+        from app.services import mailer
+        
+        delivered = []
+        class FlakyTransport:
+            def __init__(self, config):
+                pass
+            def send(self, email):
+                if email.recipient == 'bounce@example.com':
+                    raise OSError('mailbox unavailable')
+                delivered.append(email.recipient)
+            def close(self):
+                pass
+        
+        mailer.enqueue_email('a@example.com', 'Hello', 'Body')
+        mailer.enqueue_email('bounce@example.com', 'Hello', 'Body')
+        db.session.commit()
+        
+        self.app.config['MAIL_MAX_ATTEMPTS'] = 2
+        with mock.patch.dict(mailer.TRANSPORTS, {'console': FlakyTransport}):
+            self.assertEqual(mailer.drain_outbox(self.app), 1)
+            self.assertEqual(delivered, ['a@example.com'])
+            
+            bounced = OutboxEmail.query.filter_by(recipient='bounce@example.com').one()
+            self.assertEqual(bounced.status, 'pending')
+            self.assertEqual(bounced.attempts, 1)
+            self.assertGreater(bounced.next_attempt_at, datetime.utcnow())
+            
+            # Not due yet, so nothing is retried until the backoff elapses
+            self.assertEqual(mailer.drain_outbox(self.app), 0)
+            bounced.next_attempt_at = datetime.utcnow()
+            db.session.commit()
+            mailer.drain_outbox(self.app)
+            db.session.refresh(bounced)
+            self.assertEqual(bounced.status, 'dead')
+        
+        # A row reclaimed by another worker mid-send keeps that worker's claim
+        class SlowTransport(FlakyTransport):
+            def send(self, email):
+                OutboxEmail.query.filter_by(id=email.id).update({'claim_token': 'other'})
+                db.session.commit()
+        
+        mailer.enqueue_email('slow@example.com', 'Hello', 'Body')
+        db.session.commit()
+        with mock.patch.dict(mailer.TRANSPORTS, {'console': SlowTransport}):
+            self.assertEqual(mailer.drain_outbox(self.app), 0)
+        slow = OutboxEmail.query.filter_by(recipient='slow@example.com').one()
+        self.assertEqual((slow.status, slow.claim_token), ('sending', 'other'))
+        print("[OK] Email Outbox: Success")
+
+    def test_similar_applications(self):
+        self.login()
+        
+        for title, institution, app_type in [('Same Uni', 'Test Uni', 'PhD'),
+                                             ('Same Type', 'Elsewhere', 'Job'),
+                                             ('Unrelated', 'Elsewhere', 'MSc')]:
+            db.session.add(Application(
+                title=title,
+                institution=institution,
+                application_type=app_type,
+                deadline=datetime.utcnow() + timedelta(days=5),
+                user_id=self.user.id
+            ))
+        db.session.commit()
+        
+        from app.services.stats import get_similar_applications
+        similar = get_similar_applications(self.application, limit=3)
+        self.assertEqual([a.title for a in similar], ['Same Uni', 'Same Type'])
+        self.assertEqual(len(get_similar_applications(self.application, limit=1)), 1)
+        
+        response = self.client.get(f'/applications/{self.application.id}')
+        self.assertIn(b'Same Type', response.data)
+        self.assertNotIn(b'Unrelated', response.data)
+        print("[OK] Similar Applications: Success")
+
+    def test_detail_loader_query_count(self):
+        self.login()
+        from sqlalchemy import event
+        
+        def count_queries(url):
+            statements = []
+            def before_execute(conn, cursor, statement, *args):
+                statements.append(statement)
+            event.listen(db.engine, 'before_cursor_execute', before_execute)
+            try:
+                response = self.client.get(url)
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', before_execute)
+            self.assertEqual(response.status_code, 200)
+            return len(statements), response
+        
+        db.session.add(Task(description='Task 0', application_id=self.application.id))
+        db.session.commit()
+        baseline, _ = count_queries(f'/applications/{self.application.id}')
+        
+        for i in range(1, 6):
+            db.session.add(Task(description=f'Task {i}', application_id=self.application.id, is_completed=i % 2 == 0))
+            db.session.add(Document(filename=f'doc{i}.pdf', filepath=f'x/doc{i}.pdf', application_id=self.application.id))
+        db.session.commit()
+        
+        queries, _ = count_queries(f'/applications/{self.application.id}')
+        self.assertEqual(queries, baseline)
+        
+        _, response = count_queries(f'/applications/api/{self.application.id}')
+        data = response.get_json()
+        self.assertEqual(data['task_count'], 6)
+        self.assertEqual(data['completed_task_count'], 2)
+        self.assertEqual(data['document_count'], 5)
+        print("[OK] Detail Loader: Success")
+
+    def test_deduplicated_document_storage(self):
+        self.login()
+        from app.models import Blob
+        from app.services.blobstore import collect_garbage, store_upload
+        
+        def upload(content, name):
+            return self.client.post(
+                f'/applications/{self.application.id}/upload_document',
+                data={'file': (io.BytesIO(content), name)},
+                content_type='multipart/form-data',
+                follow_redirects=True
+            )
+        
+        upload(b"resume v1", 'resume.pdf')
+        upload(b"resume v1", 'resume-copy.pdf')
+        upload(b"resume v2", 'resume.pdf')
+        
+        docs = Document.query.order_by(Document.id).all()
+        self.assertEqual(len(docs), 3)
+        self.assertEqual(docs[0].sha256, docs[1].sha256)
+        self.assertNotEqual(docs[0].sha256, docs[2].sha256)
+        self.assertEqual(Blob.query.count(), 2)
+        self.assertEqual(db.session.get(Blob, docs[0].sha256).ref_count, 2)
+        
+        # Same filename, different content: both remain downloadable
+        response = self.client.get(f'/applications/document/{docs[2].id}/download')
+        self.assertEqual(response.data, b"resume v2")
+        response.close()
+        response = self.client.get(f'/applications/document/{docs[0].id}/download')
+        self.assertEqual(response.data, b"resume v1")
+        response.close()
+        
+        # Deleting the application releases every reference
+        shared = docs[0].sha256
+        self.client.post(f'/applications/{self.application.id}/delete', follow_redirects=True)
+        blob = db.session.get(Blob, shared)
+        db.session.refresh(blob)
+        self.assertEqual(blob.ref_count, 0)
+        
+        blob_file = os.path.join(self.app.config['UPLOAD_FOLDER'], docs[0].filepath)
+        self.assertTrue(os.path.exists(blob_file))
+        self.assertEqual(collect_garbage(self.app.config['UPLOAD_FOLDER'], grace=timedelta(0)), 2)
+        self.assertFalse(os.path.exists(blob_file))
+        
+        # An unreferenced row goes, but a file rewritten by a recent upload
+        # of the same content stays for the Document about to reference it
+        upload_folder = self.app.config['UPLOAD_FOLDER']
+        long_ago = datetime.utcnow() - timedelta(days=1)
+        store_upload(io.BytesIO(b"resume v2"), upload_folder)
+        db.session.add(Blob(sha256=docs[2].sha256, size=9, ref_count=0, updated_at=long_ago))
+        db.session.commit()
+        self.assertEqual(collect_garbage(upload_folder), 0)
+        self.assertIsNone(db.session.get(Blob, docs[2].sha256))
+        self.assertTrue(os.path.exists(os.path.join(upload_folder, docs[2].filepath)))
+        
+        # Files without a row are swept once older than the grace period
+        stamp = long_ago.timestamp()
+        os.utime(os.path.join(upload_folder, docs[2].filepath), (stamp, stamp))
+        self.assertEqual(collect_garbage(upload_folder), 1)
+        self.assertFalse(os.path.exists(os.path.join(upload_folder, docs[2].filepath)))
+        print("[OK] Deduplicated Storage: Success")
+
+    def test_conditional_document_download(self):
+        self.login()
+        self.client.post(
+            f'/applications/{self.application.id}/upload_document',
+            data={'file': (io.BytesIO(b"0123456789"), 'cv.pdf')},
+            content_type='multipart/form-data'
+        )
+        doc = Document.query.first()
+        url = f'/applications/document/{doc.id}/download'
+        
+        response = self.client.get(url)
+        etag = response.headers['ETag']
+        self.assertEqual(etag, f'"{doc.sha256}"')
+        self.assertIn('private', response.headers['Cache-Control'])
+        response.close()
+        
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        response.close()
+        
+        response = self.client.get(url, headers={'Range': 'bytes=2-5'})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.data, b"2345")
+        response.close()
+        
+        self.app.config['DOWNLOAD_ACCEL_REDIRECT_PREFIX'] = '/protected/'
+        response = self.client.get(url)
+        self.assertEqual(response.headers['X-Accel-Redirect'], f'/protected/{doc.filepath}')
+        self.assertEqual(response.data, b'')
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        print("[OK] Conditional Downloads: Success")
+
+    def test_bulk_mutations(self):
+        self.login()
+        
+        other_user = User(username='other', email='other@example.com')
+        other_user.set_password('password')
+        db.session.add(other_user)
+        db.session.commit()
+        foreign = Application(title='Not Mine', institution='X', application_type='Job',
+                              deadline=datetime.utcnow(), user_id=other_user.id)
+        mine = Application(title='Mine Too', institution='Y', application_type='Job',
+                           deadline=datetime.utcnow(), user_id=self.user.id)
+        db.session.add_all([foreign, mine])
+        db.session.commit()
+        ids = [self.application.id, mine.id, foreign.id]
+        
+        response = self.client.post('/applications/bulk/status', json={'ids': ids, 'status': 'Submitted'})
+        data = response.get_json()
+        self.assertEqual(data['applied'], 2)
+        self.assertEqual([r['success'] for r in data['results']], [True, True, False])
+        self.assertEqual(Application.query.filter_by(status='Submitted').count(), 2)
+        
+        response = self.client.post('/applications/bulk/status', json={'ids': ids, 'status': 'Bogus'})
+        self.assertEqual(response.status_code, 400)
+        for body in ([1, 2], 'x', 3):
+            for url in ('/applications/bulk/status', '/applications/bulk/delete',
+                        '/applications/task/bulk/toggle', '/applications/task/bulk/create'):
+                self.assertEqual(self.client.post(url, json=body).status_code, 400)
+        
+        response = self.client.post('/applications/task/bulk/create', json={'tasks': [
+            {'application_id': self.application.id, 'description': 'Bulk one'},
+            {'application_id': mine.id, 'description': 'Bulk two'},
+            {'application_id': foreign.id, 'description': 'Sneaky'},
+            {'application_id': mine.id, 'description': ''},
+        ]})
+        data = response.get_json()
+        self.assertEqual(data['applied'], 2)
+        self.assertEqual(Task.query.count(), 2)
+        
+        task_ids = [t.id for t in Task.query.all()]
+        self.client.post('/applications/task/bulk/toggle', json={'ids': task_ids})
+        self.assertEqual(Task.query.filter_by(is_completed=True).count(), 2)
+        self.client.post('/applications/task/bulk/toggle', json={'ids': task_ids, 'is_completed': False})
+        self.assertEqual(Task.query.filter_by(is_completed=True).count(), 0)
+        
+        # A file from before the blob store is removed along with its document
+        legacy_path = os.path.join(self.app.config['UPLOAD_FOLDER'], 'legacy-cv.pdf')
+        with open(legacy_path, 'wb') as fh:
+            fh.write(b'old upload')
+        db.session.add(Document(filename='cv.pdf', filepath='legacy-cv.pdf', size=10, application_id=mine.id))
+        db.session.commit()
+        
+        response = self.client.post('/applications/bulk/delete', json={'ids': ids})
+        self.assertEqual(response.get_json()['applied'], 2)
+        self.assertEqual(Application.query.count(), 1)
+        self.assertEqual(Task.query.count(), 0)
+        self.assertFalse(os.path.exists(legacy_path))
+        
+        # Deleted rows are gone from the search index too
+        response = self.client.get('/applications/?q=bulk')
+        self.assertNotIn(b'Mine Too', response.data)
+        print("[OK] Bulk Mutations: Success")
+
+    def test_bulk_import(self):
+        self.login()
+        
+        # Round-trip the export format
+        exported = self.client.get('/export/csv?gzip=1').data
+        response = self.client.post('/applications/import?format=json',
+                                    data={'file': (io.BytesIO(exported), 'export.csv.gz')},
+                                    content_type='multipart/form-data')
+        self.assertEqual(response.get_json()['imported'], 1)
+        self.assertEqual(Application.query.filter_by(title='Test App').count(), 2)
+        
+        lines = [
+            '{"Title": "Imported", "Type": "PhD", "Institution": "ETH", "Deadline": "2030-01-15", "Country": "Other"}',
+            '{"Title": "", "Type": "Job", "Institution": "X", "Deadline": "2030-01-15"}',
+            '{"Title": "Bad", "Type": "Nope", "Institution": "X", "Deadline": "15/01/2030"}',
+            '{"Title": "Truncated", "Type": "PhD"',
+            '{"Title": "After", "Type": "PhD", "Institution": "ETH", "Deadline": "2030-02-01"}',
+        ]
+        response = self.client.post('/applications/import?format=json',
+                                    data={'file': (io.BytesIO('\n'.join(lines).encode()), 'apps.jsonl')},
+                                    content_type='multipart/form-data')
+        report = response.get_json()
+        self.assertEqual(report['imported'], 2)
+        self.assertEqual(report['rejected'], 3)
+        self.assertEqual([e['row'] for e in report['errors']], [2, 3, 4])
+        self.assertEqual(len(report['errors'][1]['errors']), 2)
+        self.assertTrue(report['errors'][2]['errors'][0].startswith('Invalid JSON'))
+        
+        imported = Application.query.filter_by(title='Imported').one()
+        self.assertEqual(imported.status, 'Not Started')
+        self.assertEqual(imported.user_id, self.user.id)
+        self.assertIn(b'Imported', self.client.get('/applications/?q=eth').data)
+        print("[OK] Bulk Import: Success")
+
+    def test_metrics_endpoint(self):
+        from app.services.metrics import init_metrics, timed_job
+        self.app.config['METRICS_ENABLED'] = True
+        self.app.config['METRICS_TOKEN'] = 'secret'
+        init_metrics(self.app)
+        self.login()
+        
+        self.assertEqual(self.client.get('/dashboard').status_code, 200)
+        self.assertEqual(self.client.get('/applications/').status_code, 200)
+        
+        @timed_job('failing_job')
+        def failing_job():
+            raise RuntimeError('boom')
+        with self.assertRaises(RuntimeError):
+            failing_job()
+        
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        self.assertEqual(self.client.get('/metrics', headers={'Authorization': 'Bearer sécret'}).status_code, 401)
+        response = self.client.get('/metrics', headers={'Authorization': 'Bearer secret'})
+        self.assertEqual(response.status_code, 200)
+        body = response.get_data(as_text=True)
+        self.assertIn('apptrack_request_duration_seconds_count{blueprint="dashboard",endpoint="dashboard.index",method="GET",status="200"}', body)
+        self.assertIn('apptrack_request_db_queries_count{blueprint="applications",endpoint="applications.list"}', body)
+        self.assertIn('apptrack_template_render_seconds_count{template="dashboard.html"}', body)
+        self.assertIn('apptrack_job_runs_total{job="failing_job",outcome="error"}', body)
+        self.assertNotIn('endpoint="metrics"', body)
+        print("[OK] Metrics Endpoint: Success")
+
+    def test_conditional_get(self):
+        self.login()
+        task = Task(description='Write essay', application_id=self.application.id)
+        db.session.add(task)
+        db.session.commit()
+        
+        for url in ('/dashboard', '/api/stats', '/applications/?sort=title'):
+            first = self.client.get(url)
+            self.assertEqual(first.status_code, 200)
+            etag = first.headers['ETag']
+            self.assertIn('private', first.headers['Cache-Control'])
+            
+            cached = self.client.get(url, headers={'If-None-Match': etag})
+            self.assertEqual(cached.status_code, 304)
+            self.assertEqual(cached.get_data(), b'')
+            
+            # ORM writes to tasks and set-based bulk writes both move the version
+            self.client.post(f'/applications/task/{task.id}/toggle')
+            self.assertEqual(self.client.get(url, headers={'If-None-Match': etag}).status_code, 200)
+            etag = self.client.get(url).headers['ETag']
+            self.client.post('/applications/bulk/status',
+                             json={'ids': [self.application.id], 'status': 'Offer'})
+            self.assertEqual(self.client.get(url, headers={'If-None-Match': etag}).status_code, 200)
+        
+        # Different query strings never share an ETag
+        self.assertNotEqual(self.client.get('/applications/?sort=title').headers['ETag'],
+                            self.client.get('/applications/?sort=deadline').headers['ETag'])
+        
+        # The release id depends on the code and templates only, so every
+        # worker and every restart of the same release agree on it
+        import tempfile
+        from app.services.versions import source_digest
+        with tempfile.TemporaryDirectory() as root:
+            os.makedirs(os.path.join(root, 'templates'))
+            with open(os.path.join(root, 'templates', 'page.html'), 'w') as fh:
+                fh.write('v1')
+            first = source_digest(root)
+            self.assertEqual(source_digest(root), first)
+            with open(os.path.join(root, 'templates', 'page.html'), 'w') as fh:
+                fh.write('v2')
+            self.assertNotEqual(source_digest(root), first)
+        print("[OK] Conditional GET: Success")
+
+    def test_fragment_cache(self):
+        from app.services.fragments import SQLiteBackend
+        cache = self.app.extensions['fragment_cache']
+        cache.backend.clear()
+        self.login()
+        
+        first = self.client.get('/dashboard').get_data(as_text=True)
+        misses = cache.misses
+        second = self.client.get('/dashboard').get_data(as_text=True)
+        self.assertEqual(cache.misses, misses)
+        self.assertGreaterEqual(cache.hits, 2)
+        self.assertEqual(first.count('Test App'), second.count('Test App'))
+        
+        # A write moves the user's data version, so nothing stale is served
+        self.client.post('/applications/bulk/status',
+                         json={'ids': [self.application.id], 'status': 'Offer'})
+        self.client.get('/dashboard')
+        self.assertGreater(cache.misses, misses)
+        self.assertIn('Offer', self.client.get('/applications/').get_data(as_text=True))
+        
+        backend = SQLiteBackend(os.path.join('tests', 'test_uploads', 'fragments.db'))
+        backend.set('k', '<p>cached</p>', ttl=60)
+        backend.set('old', 'x', ttl=-1)
+        self.assertEqual(backend.get('k'), '<p>cached</p>')
+        self.assertIsNone(backend.get('old'))
+        print("[OK] Fragment Cache: Success")
+
+    def test_cached_user_loader(self):
+        from sqlalchemy import event
+        from app.models import load_user
+        cache = self.app.extensions['user_cache']
+        statements = []
+        def count(*args):
+            statements.append(args[2])
+        user_id = self.user.id
+        event.listen(db.engine, 'before_cursor_execute', count)
+        try:
+            db.session.expunge_all()
+            self.assertEqual(load_user(str(user_id)).username, 'tester')
+            self.assertEqual(len(statements), 1)
+            
+            # A hit is merged into the identity map without touching the database
+            db.session.expunge_all()
+            del statements[:]
+            user = load_user(str(user_id))
+            self.assertEqual(len(statements), 0)
+            self.assertIn(user, db.session)
+            self.assertEqual((user.username, user.email), ('tester', 'test@example.com'))
+            
+            # Updating the user evicts the entry
+            user.username = 'renamed'
+            db.session.commit()
+            self.assertIsNone(cache.get(user_id))
+            db.session.expunge_all()
+            self.assertEqual(load_user(str(user_id)).username, 'renamed')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count)
+        
+        # So does logging out
+        self.login()
+        self.client.get('/dashboard')
+        self.assertIsNotNone(cache.get(user_id))
+        self.client.get('/auth/logout')
+        self.assertIsNone(cache.get(user_id))
+        print("[OK] Cached User Loader: Success")
+
+    def test_password_hashing_pool(self):
+        import threading
+        from unittest.mock import patch
+        from werkzeug.security import generate_password_hash
+        from app.services import passwords
+        self.assertTrue(self.user.password_hash.startswith('scrypt:32768:8:1$'))
+        
+        # Hashes made with old parameters are upgraded on the next login
+        self.user.password_hash = generate_password_hash('password', 'pbkdf2:sha256:1000')
+        db.session.commit()
+        response = self.client.post('/auth/login', data={'email': 'test@example.com', 'password': 'password'})
+        self.assertEqual(response.status_code, 302)
+        db.session.refresh(self.user)
+        self.assertTrue(self.user.password_hash.startswith('scrypt:32768:8:1$'))
+        self.assertTrue(self.user.check_password('password'))
+        self.assertFalse(self.user.check_password('wrong'))
+        self.client.get('/auth/logout')
+        
+        # A full queue sheds logins with 503 instead of queueing more work
+        pool, _ = passwords._executor(self.app.config)
+        with patch.object(passwords, '_executor', return_value=(pool, threading.BoundedSemaphore(1))) as executor:
+            executor.return_value[1].acquire()
+            response = self.client.post('/auth/login', data={'email': 'test@example.com', 'password': 'password'})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers['Retry-After'], '5')
+        print("[OK] Password Hashing Pool: Success")
+
+    def test_sqlite_engine_profile(self):
+        import tempfile
+        from sqlalchemy import event
+        from sqlalchemy.exc import OperationalError
+        
+        class FileConfig(Config):
+            TESTING = True
+            WTF_CSRF_ENABLED = False
+            SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'profile.db')
+        
+        app = create_app(FileConfig)
+        read_engine = app.extensions['read_engine']
+        with app.app_context():
+            db.create_all()
+            self.assertEqual(db.session.execute(db.text('PRAGMA journal_mode')).scalar(), 'wal')
+            self.assertEqual(db.session.execute(db.text('PRAGMA synchronous')).scalar(), 1)
+            self.assertEqual(db.session.execute(db.text('PRAGMA busy_timeout')).scalar(), 5000)
+            user = User(username='reader', email='reader@example.com')
+            user.set_password('password')
+            db.session.add(user)
+            db.session.commit()
+            
+            # The read pool refuses writes outright
+            with read_engine.connect() as connection:
+                self.assertEqual(connection.execute(db.text('PRAGMA query_only')).scalar(), 1)
+                with self.assertRaises(OperationalError):
+                    connection.execute(db.text("DELETE FROM user"))
+        
+        reads = []
+        event.listen(read_engine, 'before_cursor_execute', lambda *args: reads.append(args[2]))
+        client = app.test_client()
+        client.post('/auth/login', data={'email': 'reader@example.com', 'password': 'password'})
+        self.assertEqual(reads, [])
+        self.assertEqual(client.get('/applications/').status_code, 200)
+        self.assertTrue(any('FROM application' in statement for statement in reads))
+        read_engine.dispose()
+        with app.app_context():
+            db.engine.dispose()
+        print("[OK] SQLite Engine Profile: Success")
+
+    def test_scheduler_leader_election(self):
+        from unittest.mock import patch
+        from app.models import JobRun
+        from app.services import leader
+        ttl = timedelta(seconds=60)
+        now = datetime.utcnow()
+        
+        self.assertTrue(leader.try_acquire(ttl, holder='worker-a', now=now))
+        self.assertFalse(leader.try_acquire(ttl, holder='worker-b', now=now + timedelta(seconds=30)))
+        self.assertTrue(leader.try_acquire(ttl, holder='worker-a', now=now + timedelta(seconds=30)))
+        
+        # Jobs only run in the leader and are recorded in the history
+        calls = []
+        @leader.leader_job(self.app, 'daily', every=timedelta(hours=24))
+        def daily():
+            calls.append(1)
+        @leader.leader_job(self.app, 'broken')
+        def broken():
+            raise RuntimeError('boom')
+        pending = [0, 2]
+        @leader.leader_job(self.app, 'frequent')
+        def frequent():
+            return pending.pop(0)
+        
+        with patch.object(leader, 'holder_id', return_value='worker-b'):
+            daily()
+        self.assertEqual(calls, [])
+        with patch.object(leader, 'holder_id', return_value='worker-a'):
+            daily()
+            daily()  # already ran today
+            with self.assertRaises(RuntimeError):
+                broken()
+            frequent()  # idle tick, not recorded
+            frequent()
+        self.assertEqual(calls, [1])
+        self.assertEqual(JobRun.query.filter_by(job_id='frequent').count(), 1)
+        runs = {run.job_id: run for run in JobRun.query.all()}
+        self.assertEqual(runs['daily'].outcome, 'success')
+        self.assertIsNotNone(runs['daily'].duration)
+        self.assertEqual(runs['broken'].outcome, 'error')
+        self.assertIn('boom', runs['broken'].error)
+        self.assertEqual(runs['frequent'].outcome, 'success')
+        
+        # History is pruned past the retention window, for all jobs at once
+        db.session.add(JobRun(job_id='frequent', holder='worker-a', outcome='success',
+                              started_at=now - timedelta(days=self.app.config['JOB_RUN_RETENTION_DAYS'] + 1)))
+        db.session.commit()
+        self.assertEqual(leader.prune_history(self.app), 1)
+        self.assertEqual(JobRun.query.count(), 3)
+        
+        # The leader dies mid-run: once its lease lapses another worker takes
+        # over and the unfinished run is marked abandoned
+        db.session.add(JobRun(job_id='daily', holder='worker-a', started_at=now, outcome='running'))
+        db.session.commit()
+        self.assertTrue(leader.try_acquire(ttl, holder='worker-b', now=now + timedelta(seconds=120)))
+        self.assertEqual(JobRun.query.filter_by(outcome='abandoned').count(), 1)
+        self.assertFalse(leader.try_acquire(ttl, holder='worker-a', now=now + timedelta(seconds=121)))
+        print("[OK] Scheduler Leader Election: Success")
+
+    def test_reminder_scheduling(self):
+        from datetime import date
+        from unittest import mock
+        from app.services import notifications
+        
+        self.client.post('/auth/login', data={'email': 'test@example.com', 'password': 'password'})
+        response = self.client.post('/auth/settings', data={
+            'timezone': 'America/New_York', 'reminder_hour': '8', 'reminder_offsets': '2'
+        })
+        self.assertEqual(response.status_code, 302)
+        
+        application = Application(title='Winter', institution='Tz Uni', application_type='PhD',
+                                  deadline=date(2030, 1, 10), user_id=self.user.id)
+        db.session.add(application)
+        db.session.commit()
+        # 08:00 in New York two days before, as naive UTC
+        self.assertEqual(application.next_reminder_at, datetime(2030, 1, 8, 13, 0))
+        self.assertEqual(application.next_reminder_days, 2)
+        
+        sent = []
+        with mock.patch.object(notifications, 'send_email_reminder',
+                               side_effect=lambda user, subject, body: sent.append(subject)):
+            self.assertEqual(notifications.check_upcoming_deadlines(self.app, now=datetime(2030, 1, 8, 12, 59)), 0)
+            self.assertEqual(notifications.check_upcoming_deadlines(self.app, now=datetime(2030, 1, 8, 13, 0)), 1)
+            self.assertEqual(sent, ['Reminder: Winter due in 2 days!'])
+            db.session.refresh(application)
+            self.assertIsNone(application.next_reminder_at)
+            
+            # A new deadline is scheduled afresh; a reminder missed by more
+            # than the catch-up window is skipped rather than sent late
+            application.deadline = date(2030, 2, 10)
+            db.session.commit()
+            self.assertEqual(application.next_reminder_at, datetime(2030, 2, 8, 13, 0))
+            self.assertEqual(notifications.check_upcoming_deadlines(self.app, now=datetime(2030, 2, 10)), 0)
+            db.session.refresh(application)
+            self.assertIsNone(application.next_reminder_at)
+        
+        # Bulk status changes reschedule too
+        application.deadline = date(2030, 3, 10)
+        db.session.commit()
+        self.assertIsNotNone(application.next_reminder_at)
+        self.client.post('/applications/bulk/status', json={'ids': [application.id], 'status': 'Submitted'})
+        db.session.refresh(application)
+        self.assertIsNone(application.next_reminder_at)
+        
+        # A user whose digest keeps failing does not hold up the users after
+        # them, and batches never split a user's reminders over two digests
+        other = User(username='other', email='other@example.com')
+        other.set_password('password')
+        db.session.add(other)
+        db.session.commit()
+        for user_id, title in ((self.user.id, 'Due'), (other.id, 'Due A'), (other.id, 'Due B')):
+            db.session.add(Application(title=title, institution='Uni', application_type='PhD',
+                                       deadline=date(2030, 4, 10), user_id=user_id))
+        db.session.commit()
+        self.app.config['REMINDER_BATCH_SIZE'] = 1
+        sent = []
+        def send(user, subject, body):
+            if user.id == self.user.id:
+                raise OSError('outbox unavailable')
+            sent.append((user.id, subject))
+        with mock.patch.object(notifications, 'send_email_reminder', side_effect=send):
+            self.assertEqual(notifications.check_upcoming_deadlines(self.app, now=datetime(2030, 4, 9, 9, 30)), 1)
+        self.assertEqual(sent, [(other.id, 'Reminder: 2 application deadlines coming up')])
+        print("[OK] Reminder Scheduling: Success")
+
+    def test_calendar_feed(self):
+        from unittest import mock
+        from app.services import calendar
+        
+        self.client.post('/auth/login', data={'email': 'test@example.com', 'password': 'password'})
+        self.client.post('/auth/settings/calendar')
+        token = db.session.get(User, self.user.id).calendar_token
+        self.assertTrue(token)
+        
+        application = Application(title='Feed, Inc', institution='Cal Uni', application_type='Job',
+                                  deadline=datetime(2030, 5, 1).date(), user_id=self.user.id)
+        application.tasks.append(Task(description='Write essay'))
+        application.tasks.append(Task(description='Done already', is_completed=True))
+        db.session.add(application)
+        db.session.commit()
+        self.client.get('/auth/logout')
+        
+        url = f'/calendar/{token}.ics'
+        with mock.patch.object(calendar, 'render_feed', wraps=calendar.render_feed) as render:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.mimetype, 'text/calendar')
+            body = response.get_data(as_text=True)
+            self.assertIn('DTSTART;VALUE=DATE:20300501', body)
+            self.assertIn('SUMMARY:Deadline: Feed\\, Inc (Cal Uni)', body)
+            self.assertIn('SUMMARY:Write essay', body)
+            self.assertNotIn('Done already', body)
+            self.assertTrue(body.endswith('END:VCALENDAR\r\n'))
+            etag = response.headers['ETag']
+            
+            # Polls of unchanged data get 304s; full fetches come from the cache
+            self.assertEqual(self.client.get(url, headers={'If-None-Match': etag}).status_code, 304)
+            self.assertEqual(self.client.get(url, headers={
+                'If-Modified-Since': response.headers['Last-Modified']}).status_code, 304)
+            self.assertEqual(self.client.get(url).get_data(as_text=True), body)
+            self.assertEqual(render.call_count, 1)
+            
+            application.tasks.first().is_completed = True
+            db.session.commit()
+            response = self.client.get(url, headers={'If-None-Match': etag})
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('Write essay', response.get_data(as_text=True))
+            self.assertEqual(render.call_count, 2)
+        
+        self.assertEqual(self.client.get('/calendar/not-a-token.ics').status_code, 404)
+        print("[OK] Calendar Feed: Success")
+
+    def test_application_counters(self):
+        from app.services.counters import recount
+        self.login()
+        app_id = self.application.id
+        
+        def counters():
+            db.session.refresh(self.application)
+            return (self.application.task_count, self.application.completed_task_count,
+                    self.application.document_count, self.application.document_bytes)
+        
+        self.client.post(f'/applications/{app_id}/add_task', data={'description': 'One'})
+        self.client.post(f'/applications/{app_id}/add_task', data={'description': 'Two'})
+        first, second = Task.query.order_by(Task.id).all()
+        self.client.post(f'/applications/task/{first.id}/toggle')
+        self.client.post(f'/applications/{app_id}/upload_document',
+                         data={'file': (io.BytesIO(b'12345'), 'cv.txt')}, content_type='multipart/form-data')
+        self.assertEqual(counters(), (2, 1, 1, 5))
+        
+        self.client.post(f'/applications/task/{first.id}/delete')
+        self.client.post('/applications/task/bulk/create', json={'tasks': [
+            {'application_id': app_id, 'description': 'Three'}]})
+        self.client.post('/applications/task/bulk/toggle', json={'ids': [second.id], 'is_completed': True})
+        self.client.post(f'/applications/document/{Document.query.first().id}/delete')
+        self.assertEqual(counters(), (2, 1, 0, 0))
+        
+        response = self.client.get('/applications/')
+        self.assertIn(b'1/2 tasks', response.data)
+        
+        # The repair command's recount fixes drift and leaves good rows alone
+        Application.query.filter_by(id=app_id).update({'task_count': 9}, synchronize_session=False)
+        db.session.commit()
+        self.assertEqual(recount(db.session.connection()), 1)
+        self.assertEqual(recount(db.session.connection()), 0)
+        db.session.commit()
+        self.assertEqual(counters(), (2, 1, 0, 0))
+        print("[OK] Application Counters: Success")
+
+    def test_daily_rollups(self):
+        from datetime import date
+        from app.models import DailyRollup
+        from app.services.rollups import snapshot_daily
+        
+        other = User(username='other', email='other@example.com')
+        other.set_password('password')
+        db.session.add(other)
+        db.session.commit()
+        db.session.add(Application(title='Other', institution='O', application_type='PhD', status='Interview',
+                                   country='Canada', deadline=date.today() - timedelta(days=1), user_id=other.id))
+        db.session.commit()
+        
+        yesterday = date.today() - timedelta(days=1)
+        self.assertGreater(snapshot_daily(self.app, day=yesterday), 0)
+        self.assertGreater(snapshot_daily(self.app), 0)
+        self.assertEqual(snapshot_daily(self.app), 0)  # already written today
+        self.assertEqual(DailyRollup.query.filter_by(day=date.today(), dimension='status', value='Interview')
+                         .one().count, 1)
+        
+        self.login()
+        self.assertEqual(self.client.get('/admin/stats').status_code, 404)
+        self.app.config['ADMIN_EMAILS'] = {'test@example.com'}
+        
+        response = self.client.get('/admin/api/stats?dimension=status&days=7')
+        data = response.get_json()
+        self.assertEqual(data['latest']['counts']['total'], {'applications': 2, 'users': 2})
+        self.assertEqual(data['latest']['counts']['deadline']['overdue'], 1)
+        self.assertEqual(data['days'], [yesterday.isoformat(), date.today().isoformat()])
+        self.assertEqual(data['series']['Interview'], [1, 1])
+        self.assertEqual(data['series']['Not Started'], [1, 1])
+        self.assertEqual(self.client.get('/admin/api/stats?dimension=bogus').status_code, 400)
+        
+        response = self.client.get('/admin/stats?dimension=country')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'Canada', response.data)
+        print("[OK] Daily Rollups: Success")
+
+    def test_typeahead_search(self):
+        self.login()
+        
+        other = User(username='other', email='other@example.com')
+        other.set_password('password')
+        db.session.add(other)
+        db.session.commit()
+        db.session.add_all([
+            Application(title='Robotics Fellowship', institution='Carnegie Mellon', application_type='Fellowship',
+                        notes='Ask about robots', deadline=datetime.utcnow(), user_id=self.user.id),
+            Application(title='Data Science MSc', institution='Robert Gordon University', application_type='MSc',
+                        deadline=datetime.utcnow(), user_id=self.user.id),
+            Application(title='Robotics PhD', institution='Elsewhere', application_type='PhD',
+                        deadline=datetime.utcnow(), user_id=other.id),
+        ])
+        db.session.commit()
+        
+        def suggest(q, **params):
+            response = self.client.get('/applications/api/search', query_string={'q': q, **params})
+            self.assertEqual(response.status_code, 200)
+            return [result['title'] for result in response.get_json()['results']]
+        
+        # Word prefixes of titles and institutions only, scoped to the user
+        self.assertEqual(sorted(suggest('rob')), ['Data Science MSc', 'Robotics Fellowship'])
+        self.assertEqual(suggest('carn mel'), ['Robotics Fellowship'])
+        self.assertEqual(suggest('botics'), [])
+        self.assertEqual(suggest('ask'), [])
+        self.assertEqual(suggest('  '), [])
+        self.assertEqual(len(suggest('rob', limit=1)), 1)
+        
+        # Results carry what a row of the list table shows, and honour its filters
+        response = self.client.get('/applications/api/search?q=carn')
+        result = response.get_json()['results'][0]
+        self.assertEqual(result['application_type'], 'Fellowship')
+        self.assertEqual(result['status_color'], 'secondary')
+        self.assertEqual(result['days_remaining'], 0)
+        self.assertEqual(result['delete_url'], f"/applications/{result['id']}/delete")
+        self.assertEqual(self.client.get('/applications/api/search?q=carn',
+                                         headers={'If-None-Match': response.headers['ETag']}).status_code, 304)
+        self.assertEqual(suggest('rob', type='MSc'), ['Data Science MSc'])
+        self.assertEqual(suggest('rob', status='Offer'), [])
+        
+        page = self.client.get('/applications/').get_data(as_text=True)
+        self.assertIn('id="application-row-template"', page)
+        self.assertIn('data-search-url="/applications/api/search"', page)
+        
+        # Without the index, LIKE wildcards in a term are matched literally
+        db.session.add(Application(title='Lab_Notes', institution='Uni', application_type='MSc',
+                                   deadline=datetime.utcnow(), user_id=self.user.id))
+        db.session.commit()
+        self.app.config['SEARCH_FTS_ENABLED'] = False
+        self.assertEqual(sorted(suggest('rob')), ['Data Science MSc', 'Robotics Fellowship'])
+        self.assertEqual(suggest('botics'), [])
+        self.assertEqual(suggest('lab_n'), ['Lab_Notes'])
+        self.assertEqual(suggest('r_b'), [])
+        print("[OK] Typeahead Search: Success")
+
 if __name__ == '__main__':
     unittest.main()